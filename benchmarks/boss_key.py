@@ -0,0 +1,52 @@
+"""Boss key latency check.
+
+Presses the boss key repeatedly in a headless MofishApp and checks that the
+p95 press-to-paint latency stays under ``config.boss_key_latency_target_ms``.
+
+Usage: python benchmarks/boss_key.py [--presses N]
+Exits non-zero if the target is missed.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from common import isolate_state, summarize
+
+from mofish.app import MofishApp
+from mofish.config import config
+
+
+async def measure(presses: int) -> dict[str, float | bool]:
+    """Toggle boss mode `presses` times and collect latencies."""
+    app = MofishApp()
+    async with app.run_test(size=(120, 40)) as pilot:
+        await pilot.pause()
+        for _ in range(presses):
+            await pilot.press("f10")
+            await pilot.pause()
+
+    stats = summarize(list(app.boss_key_latencies))
+    target_ms = config.boss_key_latency_target_ms
+    return {
+        "presses": stats.pop("samples"),
+        **stats,
+        "target_ms": target_ms,
+        "ok": stats.get("p95_ms", float("inf")) <= target_ms,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--presses", type=int, default=40)
+    args = parser.parse_args()
+    isolate_state()
+
+    result = asyncio.run(measure(args.presses))
+    print(json.dumps(result, indent=2))
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Shared helpers for the benchmark scripts."""
+
+import asyncio
+import atexit
+import json
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from textual.app import App
+
+from mofish.config import config
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(values_ms: list[float]) -> dict[str, float]:
+    """Mean / p50 / p95 / max of a list of millisecond samples."""
+    if not values_ms:
+        return {"samples": 0}
+    return {
+        "samples": len(values_ms),
+        "mean_ms": round(statistics.fmean(values_ms), 3),
+        "p50_ms": round(percentile(values_ms, 50), 3),
+        "p95_ms": round(percentile(values_ms, 95), 3),
+        "max_ms": round(max(values_ms), 3),
+    }
+
+
+async def until_painted(app: App) -> None:
+    """Wait until the app has processed pending work and refreshed once."""
+    done = asyncio.get_running_loop().create_future()
+    app.call_after_refresh(lambda: done.done() or done.set_result(None))
+    await done
+
+
+async def frame_time(app: App) -> float:
+    """Milliseconds from requesting a refresh to it having happened."""
+    start = time.perf_counter()
+    app.refresh()
+    await until_painted(app)
+    return (time.perf_counter() - start) * 1000
+
+
+def isolate_state() -> None:
+    """Keep the app's saved state out of ~/.mofish while benchmarking."""
+    state_dir = tempfile.mkdtemp(prefix="mofish-bench-")
+    atexit.register(shutil.rmtree, state_dir, ignore_errors=True)
+    config.policy_path = str(Path(state_dir, "policies.json"))
+    config.checkpoint_path = str(Path(state_dir, "checkpoints.json"))
+    config.usage_path = str(Path(state_dir, "usage.json"))
+    config.loop_trace_path = str(Path(state_dir, "loop-trace.log"))
+    config.daemon_socket = str(Path(state_dir, "daemon.sock"))
+
+
+def environment() -> dict[str, Any]:
+    """Interpreter and library versions, recorded next to results."""
+    import textual
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "textual": textual.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def emit(result: dict[str, Any], output: str | None) -> None:
+    """Print results as JSON and optionally write them to a file."""
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    print(text)
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
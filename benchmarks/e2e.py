@@ -0,0 +1,258 @@
+"""Headless end-to-end benchmarks for MofishApp.
+
+Drives the real app through Textual's headless harness against the fake
+NapCat server and reports JSON:
+
+- throughput:     highest event rate whose p95 frame time stays in budget
+- session_switch: set_session() to paint, for several buffer sizes
+- startup:        launch until a large contact list is on screen
+- autocomplete:   keystroke until @-mention suggestions are on screen
+
+Usage: python benchmarks/e2e.py [--scenario NAME] [--output results.json]
+Each scenario runs in its own process so global state never leaks between
+them.
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from common import emit, environment, frame_time, isolate_state, summarize, until_painted
+
+from mofish.api.events import parse_message_event
+from mofish.app import MofishApp
+from mofish.config import config
+from mofish.state.message_store import message_store
+from mofish.testing.fake_server import FakeOneBotServer, FakeServerOptions
+from mofish.ui.chatlog import ChatLog
+from mofish.ui.input import MessageInput
+from mofish.ui.sidebar import SessionItem, Sidebar
+from mofish.utils.metrics import metrics
+
+SCREEN_SIZE = (160, 48)
+
+
+@asynccontextmanager
+async def fake_napcat(**options: Any) -> AsyncIterator[FakeOneBotServer]:
+    """Run a fake server and point the client config at it."""
+    server = FakeOneBotServer(FakeServerOptions(**options))
+    await server.start()
+    config.ws_host = server.options.host
+    config.ws_port = server.port
+    config.ws_token = ""
+    try:
+        yield server
+    finally:
+        await server.stop()
+
+
+async def open_session(app: MofishApp, session_id: str, name: str = "") -> None:
+    """Open a session the same way clicking it in the sidebar does."""
+    await app.on_session_item_selected(SessionItem.Selected(session_id, name or session_id))
+    await until_painted(app)
+
+
+async def bench_throughput(args: argparse.Namespace) -> dict[str, Any]:
+    """Ramp the event rate until p95 frame time exceeds the budget."""
+    async with fake_napcat(groups=20, event_rate=0) as server:
+        app = MofishApp()
+        async with app.run_test(size=SCREEN_SIZE):
+            # The first group is the busiest, keep it open so rows are mounted
+            await open_session(app, f"group_{server.account.group_list[0]['group_id']}")
+
+            frames = metrics.rate("ws.frames")
+            steps = []
+            sustained = 0.0
+            for rate in args.rates:
+                server.options.event_rate = rate
+                await asyncio.sleep(args.warmup)
+
+                samples: list[float] = []
+                received = frames.total
+                start = time.perf_counter()
+                while time.perf_counter() - start < args.duration:
+                    samples.append(await frame_time(app))
+                    await asyncio.sleep(0.02)
+                elapsed = time.perf_counter() - start
+
+                step = {
+                    "target_rate": rate,
+                    "received_rate": round((frames.total - received) / elapsed, 1),
+                    "frame_time": summarize(samples),
+                }
+                steps.append(step)
+                if step["frame_time"]["p95_ms"] > args.frame_budget_ms:
+                    break
+                sustained = step["received_rate"]
+
+            server.options.event_rate = 0
+
+    return {
+        "frame_budget_ms": args.frame_budget_ms,
+        "sustained_messages_per_sec": sustained,
+        "steps": steps,
+    }
+
+
+async def bench_session_switch(args: argparse.Namespace) -> dict[str, Any]:
+    """Time re-rendering a session for several buffer sizes."""
+    results = []
+    async with fake_napcat(groups=len(args.buffer_sizes) + 1) as server:
+        app = MofishApp()
+        async with app.run_test(size=SCREEN_SIZE):
+            await until_painted(app)
+            chat_log = app.query_one("#chat-log", ChatLog)
+            groups = server.account.group_list
+            empty_session = f"group_{groups[-1]['group_id']}"
+
+            for size, group in zip(args.buffer_sizes, groups):
+                group_id = group["group_id"]
+                session_id = f"group_{group_id}"
+                config.message_buffer_size = size
+                for _ in range(size):
+                    raw = server.account.group_message(server.next_message_id(), group_id)
+                    event = parse_message_event(raw)
+                    if event:
+                        message_store.add(event)
+
+                samples = []
+                for _ in range(args.repeat):
+                    chat_log.set_session(empty_session, "empty")
+                    await until_painted(app)
+                    start = time.perf_counter()
+                    chat_log.set_session(session_id, group["group_name"])
+                    await until_painted(app)
+                    samples.append((time.perf_counter() - start) * 1000)
+
+                results.append({"buffer_size": size, "switch": summarize(samples)})
+
+    return {"sizes": results}
+
+
+async def bench_startup(args: argparse.Namespace) -> dict[str, Any]:
+    """Time from launch until every friend and group is in the sidebar."""
+    async with fake_napcat(groups=args.groups, friends=args.friends) as server:
+        last_session = f"group_{server.account.group_list[-1]['group_id']}"
+        start = time.perf_counter()
+        app = MofishApp()
+        async with app.run_test(size=SCREEN_SIZE):
+            mounted = (time.perf_counter() - start) * 1000
+            sidebar = app.query_one("#sidebar", Sidebar)
+            deadline = time.perf_counter() + 60
+            while sidebar.get_session(last_session) is None:
+                if time.perf_counter() > deadline:
+                    raise TimeoutError("contact list never finished loading")
+                await asyncio.sleep(0.005)
+            await until_painted(app)
+            loaded = (time.perf_counter() - start) * 1000
+
+    return {
+        "friends": args.friends,
+        "groups": args.groups,
+        "app_ready_ms": round(mounted, 1),
+        "contacts_painted_ms": round(loaded, 1),
+    }
+
+
+async def bench_autocomplete(args: argparse.Namespace) -> dict[str, Any]:
+    """Time each keystroke of an @-mention query until suggestions are painted."""
+    async with fake_napcat(groups=2, members_per_group=args.members) as server:
+        app = MofishApp()
+        async with app.run_test(size=SCREEN_SIZE) as pilot:
+            await open_session(app, f"group_{server.account.group_list[0]['group_id']}")
+
+            message_input = app.query_one("#message-input", MessageInput)
+            shown = 0
+            show_mentions = message_input.show_mentions
+
+            def counting_show(items: list[tuple[str, str]]) -> None:
+                nonlocal shown
+                shown += 1
+                show_mentions(items)
+
+            message_input.show_mentions = counting_show  # type: ignore[method-assign]
+
+            samples = []
+            for key in args.keys:
+                before = shown
+                start = time.perf_counter()
+                await pilot.press(key)
+                deadline = start + 10
+                while shown == before and time.perf_counter() < deadline:
+                    await asyncio.sleep(0)
+                await app.workers.wait_for_complete()
+                await until_painted(app)
+                samples.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "members": args.members,
+        "keys": args.keys,
+        "keystroke_to_paint": summarize(samples),
+        "per_key_ms": [round(s, 2) for s in samples],
+    }
+
+
+SCENARIOS = {
+    "throughput": bench_throughput,
+    "session_switch": bench_session_switch,
+    "startup": bench_startup,
+    "autocomplete": bench_autocomplete,
+}
+
+
+def run_isolated(name: str, argv: list[str]) -> dict[str, Any]:
+    """Run one scenario in a fresh interpreter and return its JSON result."""
+    import json
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / f"{name}.json"
+        proc = subprocess.run(
+            [sys.executable, __file__, "--scenario", name, "--output", str(output), *argv],
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0 or not output.exists():
+            return {"error": proc.stderr.strip().splitlines()[-1:] or ["failed"]}
+        return json.loads(output.read_text(encoding="utf-8"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    parser.add_argument("--rates", type=float, nargs="+",
+                        default=[25, 50, 100, 200, 400, 800])
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per rate step")
+    parser.add_argument("--warmup", type=float, default=0.5)
+    parser.add_argument("--frame-budget-ms", type=float, default=50.0)
+    parser.add_argument("--buffer-sizes", type=int, nargs="+", default=[100, 500, 1000, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--friends", type=int, default=2000)
+    parser.add_argument("--groups", type=int, default=500)
+    parser.add_argument("--members", type=int, default=3000)
+    parser.add_argument("--keys", nargs="+", default=["@", "a", "n", "backspace", "1", "0", "0"])
+    args = parser.parse_args()
+    isolate_state()
+
+    if args.scenario:
+        result = asyncio.run(SCENARIOS[args.scenario](args))
+        emit({"scenario": args.scenario, **result}, args.output)
+        return 0
+
+    argv = [a for a in sys.argv[1:] if a not in ("--output", args.output)]
+    results = {
+        "environment": environment(),
+        "scenarios": {name: run_isolated(name, argv) for name in SCENARIOS},
+    }
+    emit(results, args.output)
+    return 0 if all("error" not in r for r in results["scenarios"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
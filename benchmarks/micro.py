@@ -0,0 +1,164 @@
+"""Micro-benchmarks for the pure hot-path functions.
+
+Reports ops/sec and the peak memory allocated by a single call (tracemalloc)
+for frame filtering, parsing, formatting, highlighting, input parsing and
+member search, using synthetic data sized like a large account.
+
+Usage: python benchmarks/micro.py [--filter NAME] [--min-time 0.5] [--output micro.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from itertools import cycle
+from typing import Any, Callable, Coroutine
+
+from common import emit, environment
+from textual.content import Content
+from textual.visual import Visual
+
+from mofish.api.events import parse_message_event
+from mofish.api.filters import IgnoreFilter
+from mofish.handlers.mention_handler import MentionHandler
+from mofish.state.member_cache import member_cache
+from mofish.testing.synthetic import SyntheticAccount
+from mofish.ui.chatlog import ChatLog, MessageRow
+from mofish.utils.commands import build_message_array, parse_input
+from mofish.utils.formatting import format_content
+
+SAMPLE_EVENTS = 500
+
+INPUTS = [
+    "收到",
+    "今天几点下班？",
+    "@123456 看一下这个 bug，谢谢",
+    "/reply 987654 好的 @all 明天开会",
+    "a fairly long message " * 10,
+]
+
+QUERIES = ["", "a", "王", "1000", "zz"]
+
+
+def run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Drive a coroutine that never actually suspends, without an event loop."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+
+def measure(fn: Callable[[], Any], min_time: float) -> dict[str, float]:
+    """Ops/sec over at least `min_time` seconds, plus per-call peak allocation."""
+    # Warm up and size the batch so timer overhead is negligible
+    batch = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(batch):
+            fn()
+        if time.perf_counter() - start > 0.01:
+            break
+        batch *= 2
+
+    calls = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < min_time:
+        for _ in range(batch):
+            fn()
+        calls += batch
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(50):
+        tracemalloc.reset_peak()
+        base, _peak = tracemalloc.get_traced_memory()
+        fn()
+        _current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - base)
+    tracemalloc.stop()
+
+    return {
+        "ops_per_sec": round(calls / elapsed, 1),
+        "us_per_op": round(elapsed / calls * 1e6, 3),
+        "alloc_peak_bytes": round(sum(peaks) / len(peaks)),
+    }
+
+
+def build_benchmarks(account: SyntheticAccount) -> dict[str, Callable[[], Any]]:
+    """Create the benchmark callables over shared synthetic data."""
+    group_id = account.group_list[0]["group_id"]
+    raw_events = [account.group_message(i, group_id) for i in range(SAMPLE_EVENTS)]
+    events = [e for e in map(parse_message_event, raw_events) if e]
+
+    # Member cache as it looks after ensure_cache() on a big group
+    member_cache._cache[group_id] = {m["user_id"]: m for m in account.members(group_id)}
+
+    row = MessageRow(events[0])
+    chat_log = ChatLog()
+    mention_handler = MentionHandler()
+
+    # 50 ignored groups; half the frames belong to one of them
+    ignore_filter = IgnoreFilter()
+    ignore_filter.update([f"group_{group_id + i}" for i in range(0, 100, 2)])
+    frames = [
+        json.dumps({**e, "group_id": group_id + i % 2}, ensure_ascii=False)
+        for i, e in enumerate(raw_events)
+    ]
+
+    raw_iter = cycle(raw_events)
+    frame_iter = cycle(frames)
+    event_iter = cycle(events)
+    input_iter = cycle(INPUTS)
+    query_iter = cycle(QUERIES)
+
+    def format_row() -> Content:
+        row._event = next(event_iter)
+        return row._build_text()
+
+    def create_row() -> Visual:
+        # Constructing the widget and resolving what it paints
+        return MessageRow(next(event_iter)).visual
+
+    def search_members() -> list[tuple[str, str]]:
+        results: list[tuple[str, str]] = []
+        run_sync(mention_handler._search_group_members(group_id, next(query_iter), results))
+        return results
+
+    return {
+        "ignore_filter": lambda: ignore_filter(next(frame_iter)),
+        "json.loads": lambda: json.loads(next(frame_iter)),
+        "parse_message_event": lambda: parse_message_event(next(raw_iter)),
+        "formatting.format_content": lambda: format_content(next(event_iter), group_id),
+        "message_row.build_text": format_row,
+        "message_row.create": create_row,
+        "chat_log.should_highlight": lambda: chat_log._should_highlight(next(event_iter)),
+        "parse_input": lambda: parse_input(next(input_iter)),
+        "parse_input+build_message_array": lambda: build_message_array(parse_input(next(input_iter))),
+        "mention.search_group_members": search_members,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="only run benchmarks containing this")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per benchmark")
+    parser.add_argument("--members", type=int, default=3000)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    account = SyntheticAccount(groups=1, friends=100, members_per_group=args.members)
+    benchmarks = build_benchmarks(account)
+
+    results = {
+        name: measure(fn, args.min_time)
+        for name, fn in benchmarks.items()
+        if args.filter in name
+    }
+    emit({"environment": environment(), "members": args.members, "results": results}, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,124 @@
 """OneBot API actions wrapper."""
 
+import json
+import time
+from collections import OrderedDict
 from typing import Any
 
-from mofish.api.client import client
+from mofish.api.client import PRIORITY_NORMAL, PRIORITY_USER, client
 from mofish.api.events import (
     FriendInfo,
     GroupInfo,
+    NoticeEvent,
     parse_friend_list,
     parse_group_list,
 )
+from mofish.utils.metrics import metrics
+
+# Seconds a successful response stays cached, per read-only action
+CACHE_TTLS: dict[str, float] = {
+    "get_login_info": 3600,
+    "get_friend_list": 300,
+    "get_group_list": 300,
+    "get_group_info": 300,
+    "get_stranger_info": 600,
+}
+CACHE_SIZE = 1024  # Max cached responses across all actions
+
+
+class ResponseCache:
+    """Size-bounded LRU of action responses with per-action TTLs."""
+
+    def __init__(self, max_size: int = CACHE_SIZE) -> None:
+        self.max_size = max_size
+        # (action, params json) -> (expires_at, params, data)
+        self._entries: OrderedDict[tuple[str, str], tuple[float, dict[str, Any], Any]] = (
+            OrderedDict()
+        )
+        self._hits = metrics.counter("api_cache.hits")
+        self._misses = metrics.counter("api_cache.misses")
+        metrics.gauge("api_cache.size", lambda: len(self._entries))
+
+    @staticmethod
+    def _key(action: str, params: dict[str, Any]) -> tuple[str, str]:
+        return action, json.dumps(params, sort_keys=True)
+
+    def get(self, action: str, params: dict[str, Any]) -> Any | None:
+        """Cached data for a call, or None if missing or expired."""
+        key = self._key(action, params)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self._misses.inc()
+            return None
+        self._entries.move_to_end(key)
+        self._hits.inc()
+        return entry[2]
+
+    def put(self, action: str, params: dict[str, Any], data: Any) -> None:
+        """Store data for a call using the action's TTL."""
+        ttl = CACHE_TTLS.get(action, 0)
+        if ttl <= 0:
+            return
+        key = self._key(action, params)
+        self._entries[key] = (time.monotonic() + ttl, dict(params), data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, action: str | None = None, **params: Any) -> None:
+        """Drop entries for `action` (all if None) whose params match `params`."""
+        for key, (_expires, cached_params, _data) in list(self._entries.items()):
+            if action is not None and key[0] != action:
+                continue
+            if all(cached_params.get(k) == v for k, v in params.items()):
+                del self._entries[key]
+
+    def on_notice(self, event: NoticeEvent) -> None:
+        """Invalidate entries made stale by a notice event."""
+        notice_type = event.notice_type
+        if notice_type in ("group_increase", "group_decrease"):
+            self.invalidate("get_group_info", group_id=event.group_id)
+            if event.user_id == event.data.get("self_id"):
+                self.invalidate("get_group_list")
+        elif notice_type == "friend_add":
+            self.invalidate("get_friend_list")
+            self.invalidate("get_stranger_info", user_id=event.user_id)
+        elif notice_type == "group_card":
+            self.invalidate("get_stranger_info", user_id=event.user_id)
+
+
+# Notice types that make cached responses stale
+INVALIDATING_NOTICES = ("group_increase", "group_decrease", "friend_add", "group_card")
+
+response_cache = ResponseCache()
 
 
 async def _call_api_data(
-    action: str, params: dict | None = None, default: Any = None
+    action: str,
+    params: dict | None = None,
+    default: Any = None,
+    priority: int = PRIORITY_NORMAL,
 ) -> Any:
-    """Call API and return data if successful, else default."""
-    result = await client.call_api(action, params or {})
+    """Call API and return data if successful, else default.
+
+    Actions listed in CACHE_TTLS are answered from `response_cache` while
+    fresh.
+    """
+    params = params or {}
+    cacheable = action in CACHE_TTLS
+    if cacheable:
+        data = response_cache.get(action, params)
+        if data is not None:
+            return data
+
+    result = await client.call_api(action, params, priority=priority)
     if result.get("status") == "ok":
-        return result.get("data", default if default is not None else {})
+        data = result.get("data", default if default is not None else {})
+        if cacheable:
+            response_cache.put(action, params, data)
+        return data
     return default if default is not None else {}
 
 
@@ -40,6 +141,7 @@ async def send_private_msg(
     return await client.call_api(
         "send_private_msg",
         {"user_id": user_id, "message": message},
+        priority=PRIORITY_USER,
     )
 
 
@@ -50,6 +152,7 @@ async def send_group_msg(
     return await client.call_api(
         "send_group_msg",
         {"group_id": group_id, "message": message},
+        priority=PRIORITY_USER,
     )
 
 
@@ -58,27 +161,47 @@ async def get_login_info() -> dict[str, Any]:
     return await _call_api_data("get_login_info", default={})
 
 
-async def get_group_member_list(group_id: int) -> list[dict[str, Any]]:
+async def get_group_info(group_id: int) -> dict[str, Any]:
+    """Get group info (name, member count)."""
+    return await _call_api_data("get_group_info", {"group_id": group_id}, default={})
+
+
+async def get_stranger_info(user_id: int) -> dict[str, Any]:
+    """Get basic profile info for any QQ user."""
+    return await _call_api_data("get_stranger_info", {"user_id": user_id}, default={})
+
+
+async def get_group_member_list(
+    group_id: int, priority: int = PRIORITY_NORMAL
+) -> list[dict[str, Any]]:
     """Get group member list."""
-    return await _call_api_data("get_group_member_list", {"group_id": group_id}, default=[])
+    return await _call_api_data(
+        "get_group_member_list", {"group_id": group_id}, default=[], priority=priority
+    )
 
 
-async def get_group_msg_history(group_id: int) -> list[dict[str, Any]]:
-    """Get group message history (latest 20)."""
+async def get_group_msg_history(
+    group_id: int, priority: int = PRIORITY_NORMAL, count: int = 20
+) -> list[dict[str, Any]]:
+    """Get group message history (latest `count`)."""
     result = await client.call_api(
         "get_group_msg_history",
-        {"group_id": group_id, "count": 20},
+        {"group_id": group_id, "count": count},
+        priority=priority,
     )
     if result.get("status") == "ok":
         return result.get("data", {}).get("messages", [])
     return []
 
 
-async def get_friend_msg_history(user_id: int) -> list[dict[str, Any]]:
-    """Get friend message history (latest 20)."""
+async def get_friend_msg_history(
+    user_id: int, priority: int = PRIORITY_NORMAL, count: int = 20
+) -> list[dict[str, Any]]:
+    """Get friend message history (latest `count`)."""
     result = await client.call_api(
         "get_friend_msg_history",
-        {"user_id": user_id, "count": 20},
+        {"user_id": user_id, "count": count},
+        priority=priority,
     )
     if result.get("status") == "ok":
         return result.get("data", {}).get("messages", [])
@@ -0,0 +1,131 @@
+"""Record and replay of raw WebSocket traffic.
+
+Captures are gzip-compressed JSON lines, one frame per line::
+
+    {"t": 1718000000.123, "d": "in", "f": "<raw frame text>"}
+
+Opening an existing capture appends a new gzip member, which ``gzip`` reads
+back transparently, so a capture file only ever grows.
+"""
+
+import asyncio
+import gzip
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterator
+
+# Flush compressed data to disk at least this often (seconds)
+FLUSH_INTERVAL = 1.0
+
+
+@dataclass
+class CaptureRecord:
+    """One recorded frame."""
+
+    time: float
+    direction: str  # "in" (from NapCat) or "out" (to NapCat)
+    frame: str
+
+
+class CaptureWriter:
+    """Append-only writer for capture files."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._last_flush = time.monotonic()
+
+    def write(self, direction: str, frame: str) -> None:
+        """Record one frame."""
+        record = {"t": time.time(), "d": direction, "f": frame}
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        now = time.monotonic()
+        if now - self._last_flush >= FLUSH_INTERVAL:
+            self._file.flush()
+            self._last_flush = now
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self._file.close()
+
+
+def read_capture(path: str) -> Iterator[CaptureRecord]:
+    """Read all records of a capture file in order."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                data = json.loads(line)
+                yield CaptureRecord(time=data["t"], direction=data["d"], frame=data["f"])
+        except (EOFError, json.JSONDecodeError):
+            # Tail of a session that exited without closing the file
+            return
+
+
+def _request_key(action: str, params: dict[str, Any] | None) -> str:
+    return action + ":" + json.dumps(params or {}, sort_keys=True, ensure_ascii=False)
+
+
+class Replayer:
+    """Plays a capture back: events on a timeline, responses on demand."""
+
+    def __init__(self, path: str) -> None:
+        self.events: list[CaptureRecord] = []
+        self._responses: dict[str, deque[dict[str, Any]]] = {}
+        self._last_response: dict[str, dict[str, Any]] = {}
+
+        requests: dict[str, str] = {}  # echo -> request key
+        for record in read_capture(path):
+            try:
+                data = json.loads(record.frame)
+            except json.JSONDecodeError:
+                continue
+            if record.direction == "out":
+                if "echo" in data:
+                    requests[str(data["echo"])] = _request_key(
+                        data.get("action", ""), data.get("params")
+                    )
+            elif "echo" in data and str(data["echo"]) in requests:
+                key = requests.pop(str(data["echo"]))
+                self._responses.setdefault(key, deque()).append(data)
+            else:
+                self.events.append(record)
+
+    def response_for(self, action: str, params: dict[str, Any] | None) -> dict[str, Any]:
+        """Recorded response to an identical request (repeats the last one when used up)."""
+        key = _request_key(action, params)
+        queue = self._responses.get(key)
+        if queue:
+            self._last_response[key] = queue.popleft()
+        response = self._last_response.get(key)
+        if response is None:
+            return {
+                "status": "failed",
+                "retcode": 1404,
+                "data": None,
+                "message": f"'{action}' not in capture",
+                "wording": "",
+            }
+        return dict(response)
+
+    async def play(
+        self, dispatch: Callable[[str], Awaitable[None]], speed: float = 1.0
+    ) -> None:
+        """Feed recorded events to `dispatch`.
+
+        speed 1.0 keeps original timing, 2.0 is twice as fast, and 0 plays
+        as fast as possible (still yielding to the loop between frames).
+        """
+        if not self.events:
+            return
+        first = self.events[0].time
+        start = time.monotonic()
+        for record in self.events:
+            if speed > 0:
+                delay = (record.time - first) / speed - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+            await dispatch(record.frame)
@@ -1,14 +1,103 @@
 """WebSocket client for NapCat OneBot 11 API."""
 
 import asyncio
+import heapq
+import itertools
 import json
-import uuid
-from typing import Any, Callable
+import os
+import time
+from typing import TYPE_CHECKING, Any, Callable
 
 import websockets
-from websockets.asyncio.client import ClientConnection
+from websockets.asyncio.client import ClientConnection, unix_connect
 
 from mofish.config import config
+from mofish.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from mofish.api.capture import CaptureWriter, Replayer
+
+# call_api priorities, lower runs first when an action is at its cap
+PRIORITY_USER = 0  # Sends and anything the user is waiting on
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2  # Prefetch and catch-up
+
+# Identical in-flight calls to these read-only actions share one request
+READ_ACTION_PREFIX = "get_"
+
+# Max concurrent requests per action
+ACTION_LIMITS: dict[str, int] = {
+    "get_group_member_list": 2,  # Large payloads, expensive on NapCat
+    "get_group_msg_history": 4,
+    "get_friend_msg_history": 4,
+}
+DEFAULT_ACTION_LIMIT = 8
+
+# Reconnect backoff bounds in seconds
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+
+class RequestNotSent(ConnectionError):
+    """The request frame never reached the socket, so resending is safe."""
+
+
+class GateTicket:
+    """One request's place in an ActionGate queue."""
+
+    def __init__(self, priority: int = PRIORITY_NORMAL) -> None:
+        self.priority = priority
+        self.future: asyncio.Future[None] | None = None  # Set while queued
+
+
+class ActionGate:
+    """Concurrency cap for one action that admits waiters by priority."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        # Promoted tickets leave their old entry behind; it is skipped once
+        # the shared future is done
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+
+    async def acquire(self, ticket: GateTicket) -> None:
+        """Wait for a slot."""
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        ticket.future = future
+        heapq.heappush(self._waiters, (ticket.priority, next(self._order), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed to us just as we were cancelled
+                self.release()
+            raise
+        finally:
+            ticket.future = None
+
+    def promote(self, ticket: GateTicket, priority: int) -> None:
+        """Move a ticket up to `priority` if that is better than its own."""
+        if priority >= ticket.priority:
+            return
+        ticket.priority = priority
+        if ticket.future and not ticket.future.done():
+            heapq.heappush(self._waiters, (priority, next(self._order), ticket.future))
+
+    def release(self) -> None:
+        """Hand the slot to the best waiter, or free it."""
+        while self._waiters:
+            _priority, _order, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
 
 
 class OneBotClient:
@@ -18,67 +107,237 @@ class OneBotClient:
         self._ws: ClientConnection | None = None
         self._connected = False
         self._pending_requests: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self._echo_ids = itertools.count(1)
+        # Shared read requests and their gate tickets, by action and params
+        self._in_flight: dict[str, tuple[asyncio.Future[dict[str, Any]], GateTicket]] = {}
+        self._gates: dict[str, ActionGate] = {}
         self._event_handlers: list[Callable[[dict[str, Any]], None]] = []
+        self._frame_filter: Callable[[str], bool] | None = None
         self._reconnect_task: asyncio.Task[None] | None = None
+        self._health_task: asyncio.Task[None] | None = None
+        self._status_handlers: list[Callable[[str, float | None], None]] = []
+        self._closing = False
+        self._last_frame = time.monotonic()
+        self._heartbeat_interval = config.heartbeat_interval / 1000
+        self.latency_ms: float | None = None
+        self._frame_rate = metrics.rate("ws.frames")
+        self._rtt = metrics.histogram("ws.rtt")
+        self._reconnects = metrics.counter("ws.reconnects")
+        self._capture: "CaptureWriter | None" = None
+        self._replayer: "Replayer | None" = None
+        self._coalesced = metrics.counter("api.coalesced")
+        metrics.gauge("api.pending", lambda: len(self._pending_requests))
 
     @property
     def is_connected(self) -> bool:
         """Check if client is connected."""
-        return self._connected and self._ws is not None
+        return self._connected and (self._ws is not None or self._replayer is not None)
 
     def on_event(self, handler: Callable[[dict[str, Any]], None]) -> None:
         """Register an event handler."""
         self._event_handlers.append(handler)
 
+    def set_frame_filter(self, frame_filter: Callable[[str], bool] | None) -> None:
+        """Drop raw frames for which `frame_filter` returns True, before decoding."""
+        self._frame_filter = frame_filter
+
+    def on_status(self, handler: Callable[[str, float | None], None]) -> None:
+        """Register a connection status handler.
+
+        Called with ("connected", latency_ms) after each RTT probe and with
+        ("reconnecting", None) when the connection is lost.
+        """
+        self._status_handlers.append(handler)
+
     async def connect(self) -> bool:
         """Connect to NapCat WebSocket server."""
+        if config.replay_path:
+            return self._start_replay(config.replay_path, config.replay_speed)
+
+        self._closing = False
         try:
-            headers = {}
-            if config.ws_token:
-                headers["Authorization"] = f"Bearer {config.ws_token}"
+            await self._open()
+        except Exception as e:
+            print(f"[ERROR] Failed to connect: {e}")
+            self._connected = False
+            return False
+
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+        return True
+
+    async def _open(self) -> None:
+        """Open the socket and start receiving."""
+        headers = {}
+        if config.ws_token:
+            headers["Authorization"] = f"Bearer {config.ws_token}"
 
+        if config.use_daemon:
+            # Local daemon proxies OneBot; snapshots can be large
+            self._ws = await unix_connect(
+                os.path.expanduser(config.daemon_socket), max_size=None
+            )
+        else:
             self._ws = await websockets.connect(
                 config.ws_url,
                 additional_headers=headers,
             )
-            self._connected = True
+        self._connected = True
+        self._last_frame = time.monotonic()
 
-            # Start message receiver
-            asyncio.create_task(self._receive_loop())
+        if config.capture_path and self._capture is None:
+            from mofish.api.capture import CaptureWriter
 
-            return True
-        except Exception as e:
-            print(f"[ERROR] Failed to connect: {e}")
-            self._connected = False
-            return False
+            self._capture = CaptureWriter(config.capture_path)
+
+        # Start message receiver
+        asyncio.create_task(self._receive_loop(self._ws))
 
     async def disconnect(self) -> None:
         """Disconnect from server."""
+        self._closing = True
         self._connected = False
+        for task in (self._health_task, self._reconnect_task):
+            if task:
+                task.cancel()
+        self._health_task = self._reconnect_task = None
         if self._ws:
             await self._ws.close()
             self._ws = None
+        self._fail_pending()
+        self.close_capture()
 
-    async def _receive_loop(self) -> None:
-        """Receive and dispatch messages."""
-        if not self._ws:
-            return
+    def close_capture(self) -> None:
+        """Finish the capture file, if recording."""
+        if self._capture:
+            self._capture.close()
+            self._capture = None
+
+    def _start_replay(self, path: str, speed: float) -> bool:
+        """Play a capture file back instead of connecting."""
+        from mofish.api.capture import Replayer
 
         try:
-            async for message in self._ws:
-                try:
-                    data = json.loads(message)
-                    await self._handle_message(data)
-                except json.JSONDecodeError:
-                    continue
+            self._replayer = Replayer(path)
+        except (OSError, EOFError, KeyError) as e:
+            print(f"[ERROR] Failed to load capture: {e}")
+            return False
+        self._connected = True
+        asyncio.create_task(self._replayer.play(self._handle_frame, speed))
+        return True
+
+    async def _receive_loop(self, ws: ClientConnection) -> None:
+        """Receive and dispatch messages."""
+        try:
+            async for message in ws:
+                await self._handle_frame(message)
         except websockets.ConnectionClosed:
-            self._connected = False
+            pass
         except Exception as e:
             print(f"[ERROR] Receive error: {e}")
+
+        if self._ws is ws:
+            # Closed underneath us rather than replaced by a reconnect
             self._connected = False
+            self._fail_pending()
+            self._start_reconnect()
+
+    async def _health_loop(self) -> None:
+        """Probe round-trip time and reconnect when the socket goes quiet.
+
+        A stall is a failed probe or no frame at all (heartbeats included)
+        for one heartbeat interval plus a probe period.
+        """
+        period = config.latency_probe_interval
+        while True:
+            await asyncio.sleep(period)
+            if not self.is_connected:
+                continue
+
+            start = time.perf_counter()
+            try:
+                await self.call_api("get_status", timeout=period, priority=PRIORITY_USER)
+            except (TimeoutError, ConnectionError, websockets.ConnectionClosed):
+                # Any escape here would end probing for good
+                self._start_reconnect()
+                continue
+            self.latency_ms = (time.perf_counter() - start) * 1000
+            self._rtt.observe(self.latency_ms)
+
+            if time.monotonic() - self._last_frame > self._heartbeat_interval + period:
+                self._start_reconnect()
+                continue
+            self._notify_status("connected", self.latency_ms)
+
+    def _start_reconnect(self) -> None:
+        if self._closing or self._replayer:
+            return
+        if self._reconnect_task and not self._reconnect_task.done():
+            return
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        """Drop the current socket and reconnect with exponential backoff."""
+        self._connected = False
+        self.latency_ms = None
+        self._reconnects.inc()
+        self._notify_status("reconnecting", None)
+
+        ws, self._ws = self._ws, None
+        self._fail_pending()
+        if ws:
+            try:
+                await asyncio.wait_for(ws.close(), timeout=1.0)
+            except Exception:
+                pass
+
+        delay = RECONNECT_MIN_DELAY
+        while not self._closing:
+            try:
+                await self._open()
+            except Exception:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                continue
+            self._notify_status("connected", None)
+            return
+
+    def _notify_status(self, state: str, latency_ms: float | None) -> None:
+        for handler in self._status_handlers:
+            try:
+                handler(state, latency_ms)
+            except Exception as e:
+                print(f"[ERROR] Status handler error: {e}")
+
+    def _fail_pending(self) -> None:
+        """Fail every request still waiting for a response."""
+        pending, self._pending_requests = self._pending_requests, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Connection closed"))
+
+    async def _handle_frame(self, message: str | bytes) -> None:
+        """Decode and dispatch one raw frame."""
+        self._frame_rate.mark()
+        self._last_frame = time.monotonic()
+        if isinstance(message, bytes):
+            message = message.decode("utf-8", errors="replace")
+        if self._capture:
+            self._capture.write("in", message)
+        if self._frame_filter and self._frame_filter(message):
+            return
+        try:
+            data = json.loads(message)
+        except json.JSONDecodeError:
+            return
+        await self._handle_message(data)
 
     async def _handle_message(self, data: dict[str, Any]) -> None:
         """Handle incoming message."""
+        if data.get("meta_event_type") == "heartbeat" and data.get("interval"):
+            # NapCat reports its heartbeat period in ms
+            self._heartbeat_interval = data["interval"] / 1000
+
         # Check if it's a response to our request
         if "echo" in data:
             echo = data["echo"]
@@ -96,29 +355,101 @@ class OneBotClient:
                 print(f"[ERROR] Event handler error: {e}")
 
     async def call_api(
-        self, action: str, params: dict[str, Any] | None = None, timeout: float = 10.0
+        self,
+        action: str,
+        params: dict[str, Any] | None = None,
+        timeout: float = 10.0,
+        priority: int = PRIORITY_NORMAL,
     ) -> dict[str, Any]:
-        """Call OneBot API action."""
+        """Call OneBot API action.
+
+        Identical read-only calls already in flight share one request and
+        its response; the shared request waits at the best priority of its
+        callers. Each action has a concurrency cap; calls over the cap wait
+        and are admitted in `priority` order.
+        """
         if not self.is_connected:
-            raise ConnectionError("Not connected to server")
+            raise RequestNotSent("Not connected to server")
 
-        echo = str(uuid.uuid4())
-        request = {
-            "action": action,
-            "params": params or {},
-            "echo": echo,
-        }
+        if self._replayer:
+            return self._replayer.response_for(action, params)
 
-        future: asyncio.Future[dict[str, Any]] = asyncio.get_event_loop().create_future()
-        self._pending_requests[echo] = future
+        params = params or {}
+        if not action.startswith(READ_ACTION_PREFIX):
+            return await self._request(action, params, timeout, GateTicket(priority))
 
+        key = action + ":" + json.dumps(params, sort_keys=True)
+        entry = self._in_flight.get(key)
+        if entry is None:
+            ticket = GateTicket(priority)
+            shared = asyncio.ensure_future(self._request(action, params, timeout, ticket))
+            self._in_flight[key] = (shared, ticket)
+            shared.add_done_callback(lambda done: self._forget_in_flight(key, done))
+        else:
+            shared, ticket = entry
+            self._coalesced.inc()
+            # A user call joining a background prefetch must not wait behind it
+            self._gate(action).promote(ticket, priority)
+        # Shielded so one caller giving up does not cancel it for the others
+        return await asyncio.shield(shared)
+
+    def _forget_in_flight(self, key: str, done: asyncio.Future[dict[str, Any]]) -> None:
+        entry = self._in_flight.get(key)
+        if entry and entry[0] is done:
+            del self._in_flight[key]
+        if not done.cancelled():
+            done.exception()  # Retrieved here in case every caller went away
+
+    def _gate(self, action: str) -> ActionGate:
+        gate = self._gates.get(action)
+        if gate is None:
+            gate = self._gates[action] = ActionGate(
+                ACTION_LIMITS.get(action, DEFAULT_ACTION_LIMIT)
+            )
+        return gate
+
+    async def _request(
+        self, action: str, params: dict[str, Any], timeout: float, ticket: GateTicket
+    ) -> dict[str, Any]:
+        """Send one request once its action has a free slot."""
+        gate = self._gate(action)
+        await gate.acquire(ticket)
         try:
-            await self._ws.send(json.dumps(request))  # type: ignore
-            result = await asyncio.wait_for(future, timeout=timeout)
-            return result
-        except asyncio.TimeoutError:
-            self._pending_requests.pop(echo, None)
-            raise TimeoutError(f"API call '{action}' timed out")
+            if not self.is_connected:
+                raise RequestNotSent("Not connected to server")
+
+            echo = str(next(self._echo_ids))
+            request = {
+                "action": action,
+                "params": params,
+                "echo": echo,
+            }
+
+            future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+            self._pending_requests[echo] = future
+
+            start = time.perf_counter()
+            try:
+                frame = json.dumps(request)
+                if self._capture:
+                    self._capture.write("out", frame)
+                try:
+                    await self._ws.send(frame)  # type: ignore
+                except websockets.ConnectionClosed as e:
+                    # Callers only need to handle ConnectionError
+                    raise RequestNotSent("Connection closed") from e
+                result = await asyncio.wait_for(future, timeout=timeout)
+                metrics.histogram(f"api.{action}").observe(
+                    (time.perf_counter() - start) * 1000
+                )
+                return result
+            except asyncio.TimeoutError:
+                metrics.counter("api.timeouts").inc()
+                raise TimeoutError(f"API call '{action}' timed out")
+            finally:
+                self._pending_requests.pop(echo, None)
+        finally:
+            gate.release()
 
 
 # Global client instance
@@ -1,8 +1,14 @@
 """OneBot 11 event types and parsing."""
 
+import re
 from dataclasses import dataclass
 from typing import Any
 
+from mofish.utils.metrics import metrics
+
+# CQ codes in raw_message ([CQ:image,file=...] etc.)
+CQ_CODE_RE = re.compile(r"\[CQ:[^\]]*\]")
+
 
 @dataclass
 class MessageSegment:
@@ -50,6 +56,33 @@ class MessageEvent:
     raw_message: str
     segments: list[MessageSegment]
     time: int
+    recalled: bool = False
+    self_id: int = 0  # Account that received the message
+
+    def to_onebot(self) -> dict[str, Any]:
+        """Convert back to a OneBot 11 message event (for snapshots)."""
+        data: dict[str, Any] = {
+            "post_type": "message",
+            "message_type": self.message_type,
+            "sub_type": self.sub_type,
+            "message_id": self.message_id,
+            "user_id": self.user_id,
+            "sender": {"user_id": self.user_id, "nickname": self.sender_nickname,
+                       "card": self.sender_card},
+            "raw_message": self.raw_message,
+            "message": [{"type": seg.type, "data": seg.data} for seg in self.segments],
+            "time": self.time,
+            "self_id": self.self_id,
+        }
+        if self.group_id is not None:
+            data["group_id"] = self.group_id
+        return data
+
+    @property
+    def mentions_self(self) -> bool:
+        """Check if the message @-mentions this account (or @all)."""
+        me = str(self.self_id)
+        return any(seg.is_at and str(seg.at_qq) in (me, "all") for seg in self.segments)
 
     @property
     def display_name(self) -> str:
@@ -89,6 +122,52 @@ def parse_message_event(data: dict[str, Any]) -> MessageEvent | None:
     if data.get("post_type") != "message":
         return None
 
+    with metrics.timer("events.parse"):
+        return _build_message_event(data)
+
+
+def history_messages(history: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Raw message events of a *_msg_history response (entries often lack post_type)."""
+    for data in history:
+        data.setdefault("post_type", "message")
+    return [data for data in history if data["post_type"] == "message"]
+
+
+def parse_history(history: list[dict[str, Any]]) -> list[MessageEvent]:
+    """Parse a *_msg_history response, oldest first."""
+    return [
+        event for event in map(parse_message_event, history_messages(history)) if event
+    ]
+
+
+def raw_session_id(data: dict[str, Any]) -> str:
+    """Session identifier of a raw message event, without parsing it."""
+    if data.get("message_type") == "group":
+        return f"group_{data.get('group_id')}"
+    return f"private_{data.get('user_id')}"
+
+
+def raw_preview(data: dict[str, Any], length: int) -> str:
+    """Preview text of a raw message event, from raw_message alone."""
+    text = CQ_CODE_RE.sub("", data.get("raw_message", "")).strip()
+    return text[:length] or "[媒体消息]"
+
+
+def raw_mentions_self(data: dict[str, Any]) -> bool:
+    """Whether a raw message event @-mentions its receiver (or @all)."""
+    segments = data.get("message")
+    if not isinstance(segments, list):
+        return False
+    me = str(data.get("self_id"))
+    return any(
+        isinstance(seg, dict) and seg.get("type") == "at"
+        and str(seg.get("data", {}).get("qq")) in (me, "all")
+        for seg in segments
+    )
+
+
+def _build_message_event(data: dict[str, Any]) -> MessageEvent:
+    """Build a MessageEvent from a raw message event."""
     # Parse message segments (Array format)
     raw_segments = data.get("message", [])
     segments: list[MessageSegment] = []
@@ -117,6 +196,7 @@ def parse_message_event(data: dict[str, Any]) -> MessageEvent | None:
         raw_message=data.get("raw_message", ""),
         segments=segments,
         time=data.get("time", 0),
+        self_id=data.get("self_id", 0),
     )
 
 
@@ -124,8 +204,12 @@ def create_self_message(
     text: str,
     session_id: str,
     nickname: str = "我",
+    message_id: int = 0,
 ) -> MessageEvent:
-    """Create a local echo message for sent messages."""
+    """Create a local echo message for sent messages.
+
+    A negative message_id marks a pending echo that has not been acked yet.
+    """
     import time as time_module
 
     is_group = session_id.startswith("group_")
@@ -136,7 +220,7 @@ def create_self_message(
     return MessageEvent(
         message_type="group" if is_group else "private",
         sub_type="normal",
-        message_id=0,
+        message_id=message_id,
         user_id=target_id if not is_group else 0,  # Match session_id for private
         group_id=target_id if is_group else None,
         sender_nickname=nickname,
@@ -147,6 +231,106 @@ def create_self_message(
     )
 
 
+@dataclass
+class NoticeEvent:
+    """Parsed notice event (recall, member change, poke, ...)."""
+
+    notice_type: str
+    sub_type: str
+    group_id: int | None
+    user_id: int
+    operator_id: int
+    target_id: int
+    message_id: int
+    time: int
+    data: dict[str, Any]  # Raw event, for type-specific fields
+
+    @property
+    def session_id(self) -> str:
+        """Get the session this notice belongs to."""
+        if self.group_id:
+            return f"group_{self.group_id}"
+        return f"private_{self.user_id}"
+
+
+@dataclass
+class RequestEvent:
+    """Parsed friend or group join/invite request."""
+
+    request_type: str  # "friend" or "group"
+    sub_type: str
+    user_id: int
+    group_id: int | None
+    comment: str
+    flag: str  # Pass back to approve/reject
+    time: int
+
+
+@dataclass
+class MetaEvent:
+    """Parsed meta event (heartbeat, lifecycle)."""
+
+    meta_event_type: str
+    sub_type: str
+    interval: int  # Heartbeat period in ms
+    status: dict[str, Any]
+    time: int
+
+
+def parse_notice_event(data: dict[str, Any]) -> NoticeEvent | None:
+    """Parse raw event data into NoticeEvent."""
+    if data.get("post_type") != "notice":
+        return None
+
+    # Pokes are notify/poke in OneBot 11
+    notice_type = data.get("notice_type", "")
+    sub_type = data.get("sub_type", "")
+    if notice_type == "notify" and sub_type == "poke":
+        notice_type = "poke"
+
+    return NoticeEvent(
+        notice_type=notice_type,
+        sub_type=sub_type,
+        group_id=data.get("group_id"),
+        user_id=data.get("user_id", 0),
+        operator_id=data.get("operator_id", 0),
+        target_id=data.get("target_id", 0),
+        message_id=data.get("message_id", 0),
+        time=data.get("time", 0),
+        data=data,
+    )
+
+
+def parse_request_event(data: dict[str, Any]) -> RequestEvent | None:
+    """Parse raw event data into RequestEvent."""
+    if data.get("post_type") != "request":
+        return None
+
+    return RequestEvent(
+        request_type=data.get("request_type", ""),
+        sub_type=data.get("sub_type", ""),
+        user_id=data.get("user_id", 0),
+        group_id=data.get("group_id"),
+        comment=data.get("comment", ""),
+        flag=data.get("flag", ""),
+        time=data.get("time", 0),
+    )
+
+
+def parse_meta_event(data: dict[str, Any]) -> MetaEvent | None:
+    """Parse raw event data into MetaEvent."""
+    if data.get("post_type") != "meta_event":
+        return None
+
+    return MetaEvent(
+        meta_event_type=data.get("meta_event_type", ""),
+        sub_type=data.get("sub_type", ""),
+        interval=data.get("interval", 0),
+        status=data.get("status") or {},
+        time=data.get("time", 0),
+    )
+
+
 @dataclass
 class FriendInfo:
     """Friend information."""
@@ -0,0 +1,58 @@
+"""Raw-frame filters applied before JSON decoding."""
+
+import re
+from typing import Iterable
+
+from mofish.utils.metrics import metrics
+
+
+class IgnoreFilter:
+    """Recognises frames of ignored sessions without decoding them.
+
+    Matches the ``"group_id":<id>`` / ``"user_id":<id>`` fields in the raw
+    JSON text. Quotes inside message text are escaped, so user content
+    cannot fake a match. API responses (frames with an ``"echo"`` key) are
+    never dropped.
+    """
+
+    def __init__(self) -> None:
+        self._groups: re.Pattern[str] | None = None
+        self._users: re.Pattern[str] | None = None
+        self._dropped = metrics.counter("events.ignored")
+
+    def update(self, session_ids: Iterable[str]) -> None:
+        """Set the ignored sessions."""
+        groups: list[str] = []
+        users: list[str] = []
+        for session_id in session_ids:
+            kind, _, target = session_id.partition("_")
+            if target.isdigit():
+                (groups if kind == "group" else users).append(target)
+        self._groups = self._compile("group_id", groups)
+        self._users = self._compile("user_id", users)
+
+    @staticmethod
+    def _compile(key: str, ids: list[str]) -> re.Pattern[str] | None:
+        if not ids:
+            return None
+        return re.compile(rf'"{key}":\s*(?:{"|".join(ids)})\b')
+
+    def __call__(self, frame: str) -> bool:
+        """True if the frame belongs to an ignored session."""
+        if self._groups is None and self._users is None:
+            return False
+        if '"echo"' in frame:
+            return False
+        if self._groups and self._groups.search(frame):
+            self._dropped.inc()
+            return True
+        # user_id also names the sender in group events, so only private
+        # traffic (no group_id at all) is matched on it
+        if self._users and '"group_id"' not in frame and self._users.search(frame):
+            self._dropped.inc()
+            return True
+        return False
+
+
+# Global filter instance
+ignore_filter = IgnoreFilter()
@@ -0,0 +1,167 @@
+"""Outgoing message queue with per-session ordering and rate limiting."""
+
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from mofish.api import actions
+from mofish.api.client import RequestNotSent
+from mofish.config import config
+
+
+# Errors worth retrying: the request was never written, so NapCat cannot
+# have delivered it. A timeout or a connection lost while waiting for the
+# response is final, since resending could post the message twice.
+TRANSIENT_ERRORS = (RequestNotSent,)
+
+
+class SendError(Exception):
+    """Raised when the server rejects an outgoing message."""
+
+
+@dataclass
+class OutgoingMessage:
+    """A message waiting to be sent."""
+
+    local_id: int  # Negative placeholder id used by the pending echo
+    session_id: str
+    is_group: bool
+    target_id: int
+    message: list[dict[str, Any]]
+    attempts: int = 0
+
+
+class TokenBucket:
+    """Token bucket limiter shared by all sessions."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available, then take it."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class Outbox:
+    """Queues outgoing messages and sends them in order per session."""
+
+    def __init__(self) -> None:
+        self._queues: dict[str, asyncio.Queue[OutgoingMessage]] = {}
+        self._workers: dict[str, asyncio.Task[None]] = {}
+        self._bucket: TokenBucket | None = None
+        self._local_ids = itertools.count(1)
+        self._ack_handlers: list[Callable[[OutgoingMessage, int], None]] = []
+        self._fail_handlers: list[Callable[[OutgoingMessage, Exception], None]] = []
+
+    def on_ack(self, handler: Callable[[OutgoingMessage, int], None]) -> None:
+        """Register a handler called with the real message_id once sent."""
+        self._ack_handlers.append(handler)
+
+    def on_failed(self, handler: Callable[[OutgoingMessage, Exception], None]) -> None:
+        """Register a handler called when a message is given up on."""
+        self._fail_handlers.append(handler)
+
+    def enqueue(
+        self,
+        session_id: str,
+        is_group: bool,
+        target_id: int,
+        message: list[dict[str, Any]],
+    ) -> OutgoingMessage:
+        """Queue a message for sending. Never blocks on the network."""
+        item = OutgoingMessage(
+            local_id=-next(self._local_ids),
+            session_id=session_id,
+            is_group=is_group,
+            target_id=target_id,
+            message=message,
+        )
+
+        if session_id not in self._queues:
+            self._queues[session_id] = asyncio.Queue()
+        self._queues[session_id].put_nowait(item)
+
+        worker = self._workers.get(session_id)
+        if worker is None or worker.done():
+            self._workers[session_id] = asyncio.create_task(self._worker(session_id))
+
+        return item
+
+    def pending_count(self, session_id: str | None = None) -> int:
+        """Number of queued messages, for one session or all."""
+        if session_id is not None:
+            queue = self._queues.get(session_id)
+            return queue.qsize() if queue else 0
+        return sum(q.qsize() for q in self._queues.values())
+
+    async def _worker(self, session_id: str) -> None:
+        """Drain one session's queue, one message at a time."""
+        queue = self._queues[session_id]
+        while not queue.empty():
+            item = queue.get_nowait()
+            try:
+                message_id = await self._send_with_retry(item)
+            except Exception as e:
+                self._notify(self._fail_handlers, item, e)
+            else:
+                self._notify(self._ack_handlers, item, message_id)
+            finally:
+                queue.task_done()
+
+    async def _send_with_retry(self, item: OutgoingMessage) -> int:
+        """Send a message, retrying with backoff while it could not be written."""
+        if self._bucket is None:
+            self._bucket = TokenBucket(config.send_rate, config.send_burst)
+
+        delay = config.send_retry_delay
+        while True:
+            item.attempts += 1
+            await self._bucket.acquire()
+            try:
+                return await self._send(item)
+            except TRANSIENT_ERRORS:
+                if item.attempts > config.send_max_retries:
+                    raise
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    async def _send(self, item: OutgoingMessage) -> int:
+        """Send a single message and return its server message_id."""
+        if item.is_group:
+            result = await actions.send_group_msg(item.target_id, item.message)
+        else:
+            result = await actions.send_private_msg(item.target_id, item.message)
+
+        if result.get("status") != "ok":
+            raise SendError(result.get("wording") or result.get("message") or "rejected")
+        return (result.get("data") or {}).get("message_id", 0)
+
+    def _notify(self, handlers: list[Callable[..., None]], *args: Any) -> None:
+        for handler in handlers:
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"[ERROR] Outbox handler error: {e}")
+
+
+# Global outbox instance
+outbox = Outbox()
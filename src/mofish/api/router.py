@@ -0,0 +1,90 @@
+"""Typed routing of OneBot events to subscribers."""
+
+from typing import Any, Callable
+
+from mofish.api.events import (
+    parse_message_event,
+    parse_meta_event,
+    parse_notice_event,
+    parse_request_event,
+)
+from mofish.utils.metrics import metrics
+
+# post_type -> (parser, attribute of the parsed event used as sub-key)
+ROUTES: dict[str, tuple[Callable[[dict[str, Any]], Any], str]] = {
+    "message": (parse_message_event, "message_type"),
+    "notice": (parse_notice_event, "notice_type"),
+    "request": (parse_request_event, "request_type"),
+    "meta_event": (parse_meta_event, "meta_event_type"),
+}
+
+
+class EventRouter:
+    """Dispatches raw events, parsed once, to handlers keyed on type."""
+
+    def __init__(self) -> None:
+        # (post_type, sub-key or None for all) -> handlers
+        self._handlers: dict[tuple[str, str | None], list[Callable[[Any], None]]] = {}
+        self._prefilters: dict[str, list[Callable[[dict[str, Any]], bool]]] = {}
+        self._post_types: set[str] = set()
+        self._dropped = metrics.counter("events.unrouted")
+
+    def subscribe(self, post_type: str, handler: Callable[[Any], None], *sub_types: str) -> None:
+        """Call `handler` with the parsed event for `post_type`.
+
+        With `sub_types` (e.g. "group_recall" for notices) only those
+        events are delivered; without, every event of the post type is.
+        """
+        if post_type not in ROUTES:
+            raise ValueError(f"Unknown post_type: {post_type}")
+        self._post_types.add(post_type)
+        for key in sub_types or (None,):
+            self._handlers.setdefault((post_type, key), []).append(handler)
+
+    def add_prefilter(self, post_type: str, prefilter: Callable[[dict[str, Any]], bool]) -> None:
+        """Run `prefilter` on raw events before parsing; False drops the event."""
+        self._prefilters.setdefault(post_type, []).append(prefilter)
+
+    def route(self, data: dict[str, Any]) -> None:
+        """Parse and dispatch one raw event (register with client.on_event)."""
+        post_type = data.get("post_type", "")
+        if post_type not in self._post_types:
+            # Nobody listens: skip parsing entirely
+            self._dropped.inc()
+            return
+
+        event = self.admit(data)
+        if event is None:
+            return
+
+        _parser, key_attr = ROUTES[post_type]
+        handlers = self._handlers.get((post_type, getattr(event, key_attr)), [])
+        handlers = handlers + self._handlers.get((post_type, None), [])
+        if not handlers:
+            self._dropped.inc()
+            return
+
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                print(f"[ERROR] Event handler error: {e}")
+
+    def admit(self, data: dict[str, Any]) -> Any | None:
+        """Run prefilters and parse a raw event, without dispatching it.
+
+        Returns None if a prefilter dropped the event or it did not parse.
+        For callers that handle a batch of events themselves.
+        """
+        post_type = data.get("post_type", "")
+        if post_type not in ROUTES:
+            return None
+        for prefilter in self._prefilters.get(post_type, ()):
+            if not prefilter(data):
+                return None
+        parser, _key_attr = ROUTES[post_type]
+        return parser(data)
+
+
+# Global router instance
+router = EventRouter()
@@ -1,22 +1,46 @@
 """Main Textual application for Mofish."""
 
+import asyncio
+import time
+from collections import deque
 from pathlib import Path
 from typing import Any
 
+from textual import events
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.containers import Container, Horizontal, Vertical
+from textual.css.query import NoMatches
 from textual.widgets import Footer, Static
 
 from mofish.api import actions
-from mofish.api.client import client
+from mofish.api.client import PRIORITY_USER, client
+from mofish.api.events import (
+    FriendInfo,
+    GroupInfo,
+    MessageEvent,
+    NoticeEvent,
+    RequestEvent,
+    parse_history,
+    parse_message_event,
+    raw_session_id,
+)
+from mofish.api.filters import ignore_filter
+from mofish.api.outbox import OutgoingMessage, outbox
+from mofish.api.router import router
 from mofish.config import config
-from mofish.state.member_cache import member_cache
-from mofish.state.session import session_state
+from mofish.daemon import CAUGHT_UP_EVENT
+from mofish.state.catch_up import catch_up
+from mofish.state.member_cache import MEMBER_NOTICES, member_cache
+from mofish.state.message_store import message_store
+from mofish.state.policy import policy_filter
+from mofish.state.prefetch import prefetcher
+from mofish.state.session import POLICY_IGNORED, POLICY_NORMAL, session_state
 from mofish.ui.boss_mode import BossMode
 from mofish.ui.chatlog import ChatLog
 from mofish.ui.input import MessageInput
 from mofish.ui.sidebar import SessionItem, Sidebar
+from mofish.ui.stats_panel import StatsPanel
 
 
 class MofishApp(App):
@@ -36,6 +60,9 @@ class MofishApp(App):
         super().__init__()
         self._boss_mode_active = False
         self._connected = False
+        # Boss key press-to-paint latencies in ms (most recent last)
+        self.boss_key_latencies: deque[float] = deque(maxlen=100)
+        self._loop_monitor = None
         
         # Initialize handlers
         from mofish.handlers.event_handler import EventHandler
@@ -46,6 +73,11 @@ class MofishApp(App):
         self.mention_handler = MentionHandler()
         self.event_handler = EventHandler()
 
+    @property
+    def rendering_suspended(self) -> bool:
+        """Whether chat rendering is paused (boss mode is showing)."""
+        return self._boss_mode_active
+
     def compose(self) -> ComposeResult:
         # Main layout
         with Container(id="main-container"):
@@ -54,16 +86,19 @@ class MofishApp(App):
                 with Vertical(id="chat-container"):
                     yield ChatLog(id="chat-log")
                     yield MessageInput(id="message-input")
+                yield StatsPanel(id="stats-panel")
 
             # Boss mode overlay (hidden by default)
             yield BossMode(id="boss-mode")
 
-        # Status bar
-        yield Static(
-            "[#555555]Connecting...[/]",
-            id="status-bar",
-            markup=True,
-        )
+        # Status bar: notices on the left, connection latency on the right
+        with Horizontal(id="status-row"):
+            yield Static(
+                "[#555555]Connecting...[/]",
+                id="status-bar",
+                markup=True,
+            )
+            yield Static("", id="status-latency")
 
     async def on_mount(self) -> None:
         """Initialize on mount."""
@@ -71,15 +106,73 @@ class MofishApp(App):
         boss_mode = self.query_one("#boss-mode", BossMode)
         boss_mode.display = False
 
+        # Optional event-loop lag tracing
+        if config.loop_monitor:
+            from mofish.utils.loop_monitor import LoopMonitor
+
+            self._loop_monitor = LoopMonitor(
+                config.loop_trace_path,
+                interval=config.loop_monitor_interval,
+                threshold=config.slow_callback_threshold,
+            )
+            self._loop_monitor.start()
+
         # Connect to NapCat
         await self._connect()
 
+    def on_unmount(self) -> None:
+        """Stop background monitors."""
+        if self._loop_monitor:
+            self._loop_monitor.stop()
+        client.close_capture()
+        try:
+            prefetcher.save(config.usage_path)
+            if not config.use_daemon:
+                catch_up.save(config.checkpoint_path)
+        except OSError:
+            pass
+
+    async def on_event(self, event: events.Event) -> None:
+        """Treat every key press as foreground activity for the prefetcher."""
+        if isinstance(event, events.Key):
+            prefetcher.touch()
+        await super().on_event(event)
+
     async def _connect(self) -> None:
         """Connect to NapCat and load sessions."""
         status = self.query_one("#status-bar", Static)
 
-        # Register event handler
-        client.on_event(self._on_event)
+        # Ignored sessions are dropped as raw frames, muted ones before parsing
+        session_state.load_policies(config.policy_path)
+        ignore_filter.update(session_state.sessions_with_policy(POLICY_IGNORED))
+        client.set_frame_filter(ignore_filter)
+        prefetcher.load(config.usage_path)
+
+        # Route events to the subsystems that care about them
+        client.on_event(router.route)
+        if config.use_daemon:
+            # Attached UIs are caught up by the daemon
+            client.on_event(self._on_daemon_caught_up)
+        else:
+            catch_up.load(config.checkpoint_path)
+            router.add_prefilter("message", catch_up.observe)
+        router.add_prefilter("message", self._filter_message)
+        policy_filter.on_change(self._on_policy_changed)
+        policy_filter.on_muted(self._on_muted_message)
+        router.subscribe("message", self._on_incoming_message)
+        router.subscribe("message", prefetcher.on_message)
+        router.subscribe("notice", self._on_recall, "group_recall", "friend_recall")
+        router.subscribe("notice", self._on_friend_add, "friend_add")
+        router.subscribe("notice", member_cache.on_notice, *MEMBER_NOTICES)
+        router.subscribe(
+            "notice", actions.response_cache.on_notice, *actions.INVALIDATING_NOTICES
+        )
+        router.subscribe("request", self._on_request)
+        client.on_status(self._on_connection_status)
+
+        # Register outgoing message callbacks
+        outbox.on_ack(self._on_send_ack)
+        outbox.on_failed(self._on_send_failed)
 
         # Connect
         success = await client.connect()
@@ -90,8 +183,55 @@ class MofishApp(App):
         self._connected = True
         status.update("[#00ff00]✓ Connected[/]")
 
-        # Load friend and group lists
-        await self._load_sessions()
+        # Load friend and group lists (warm from the daemon when attached)
+        if config.use_daemon:
+            await self._load_snapshot()
+        else:
+            await self._load_sessions()
+            self.run_worker(catch_up.run(self._on_caught_up), exit_on_error=False)
+
+    async def _load_snapshot(self) -> None:
+        """Load contacts, sessions, messages and members from the daemon."""
+        result = await client.call_api("mofish_snapshot", timeout=30.0)
+        if result.get("status") != "ok":
+            await self._load_sessions()
+            return
+        snapshot = result["data"]
+        sidebar = self.query_one("#sidebar", Sidebar)
+
+        session_state.policies = snapshot.get("policies", {})
+        ignore_filter.update(session_state.sessions_with_policy(POLICY_IGNORED))
+
+        for data in snapshot.get("friends", []):
+            friend = FriendInfo(**data)
+            session_state.add_friend(friend)
+            sidebar.add_friend(friend)
+        for data in snapshot.get("groups", []):
+            group = GroupInfo(**data)
+            session_state.add_group(group)
+            sidebar.add_group(group)
+
+        for group_id, members in snapshot.get("members", {}).items():
+            member_cache.set_members(int(group_id), members)
+
+        for session_id, messages in snapshot.get("messages", {}).items():
+            for data in messages:
+                event = parse_message_event(data)
+                if event:
+                    message_store.add(event)
+        for session_id, recalled in snapshot.get("recalled", {}).items():
+            for message_id in recalled:
+                message_store.recall(session_id, message_id)
+
+        for session_id, info in snapshot.get("sessions", {}).items():
+            session = session_state.get_session(session_id)
+            if session:
+                session.unread_count = info["unread"]
+                session.last_message = info["last_message"]
+                sidebar.sync_session(session_id, info["unread"], info["last_message"])
+
+        for session_id, policy in session_state.policies.items():
+            sidebar.set_policy(session_id, policy)
 
     async def _load_sessions(self) -> None:
         """Load friend and group lists."""
@@ -109,9 +249,105 @@ class MofishApp(App):
             session_state.add_group(group)
             sidebar.add_group(group)
 
-    def _on_event(self, data: dict[str, Any]) -> None:
-        """Handle incoming events from NapCat."""
-        self.event_handler.handle_event(data, self)
+        for session_id, policy in session_state.policies.items():
+            sidebar.set_policy(session_id, policy)
+
+    def set_session_policy(self, session_id: str, policy: str) -> None:
+        """Apply and persist a session's mute / ignore / archive policy."""
+        policy_filter.apply(session_id, policy)
+        if config.use_daemon:
+            self.run_worker(
+                client.call_api("mofish_set_policy", {"session_id": session_id, "policy": policy}),
+                exit_on_error=False,
+            )
+
+    def _on_policy_changed(self, session_id: str, policy: str) -> None:
+        """Reflect a policy change (also an archived session coming back)."""
+        if policy != POLICY_NORMAL:
+            prefetcher.forget(session_id)
+        self.query_one("#sidebar", Sidebar).set_policy(session_id, policy)
+
+    def _on_muted_message(self, session_id: str, preview: str) -> None:
+        self.event_handler.handle_muted(session_id, preview, self)
+
+    def _filter_message(self, data: dict[str, Any]) -> bool:
+        """Apply session policies to a raw message event."""
+        if policy_filter(data):
+            return True
+        # Not buffered, so a warm open would miss it
+        prefetcher.forget(raw_session_id(data))
+        return False
+
+    def _on_incoming_message(self, event: MessageEvent) -> None:
+        """Handle incoming messages from NapCat."""
+        self.event_handler.handle_message(event, self)
+
+    def _on_caught_up(self, session_id: str, messages: list[dict[str, Any]]) -> None:
+        """Handle one session's missed messages (oldest first) as a batch."""
+        events = [event for event in map(router.admit, messages) if event]
+        if events:
+            self.event_handler.handle_caught_up(session_id, events, self)
+            prefetcher.on_message(events[-1])
+
+    def _on_daemon_caught_up(self, data: dict[str, Any]) -> None:
+        """Catch-up batches relayed by the daemon."""
+        if data.get("post_type") == CAUGHT_UP_EVENT:
+            self._on_caught_up(data["session_id"], data["messages"])
+
+    def _on_recall(self, event: NoticeEvent) -> None:
+        """Handle a recalled message."""
+        self.event_handler.handle_recall(event, self)
+
+    def _on_friend_add(self, event: NoticeEvent) -> None:
+        """Handle a new friend."""
+        self.event_handler.handle_friend_add(event, self)
+
+    def _on_request(self, event: RequestEvent) -> None:
+        """Handle friend / group requests."""
+        self.event_handler.handle_request(event, self)
+
+    def _on_connection_status(self, state: str, latency_ms: float | None) -> None:
+        """Show connection health in the status bar and latency next to it.
+
+        Probes only refresh the latency segment, so notices in the status
+        bar (send failures, /stats exports) are not overwritten.
+        """
+        try:
+            status = self.query_one("#status-bar", Static)
+            latency = self.query_one("#status-latency", Static)
+        except NoMatches:
+            # Probe finished after the app shut down
+            return
+        if state == "reconnecting":
+            self._connected = False
+            if not config.use_daemon:
+                catch_up.mark_gap()
+            prefetcher.invalidate()
+            status.update("[#ffaa00]⟳ Reconnecting...[/]")
+            latency.update("")
+            return
+
+        if not self._connected:
+            if not config.use_daemon:
+                # Back after a disconnect: fetch what was missed
+                self.run_worker(catch_up.run(self._on_caught_up), exit_on_error=False)
+            status.update("[#00ff00]✓ Connected[/]")
+        self._connected = True
+        if latency_ms is not None:
+            latency.update(f"{latency_ms:.0f}ms")
+
+    def _on_send_ack(self, item: OutgoingMessage, message_id: int) -> None:
+        """Handle a queued message being accepted by NapCat."""
+        self.input_handler.handle_send_ack(item, message_id, self)
+
+    def _on_send_failed(self, item: OutgoingMessage, error: Exception) -> None:
+        """Handle a queued message that could not be sent."""
+        self.input_handler.handle_send_failed(item, error, self)
+
+    def on_session_item_focused(self, message: SessionItem.Focused) -> None:
+        """Prefetch the session under keyboard focus and the next one."""
+        sidebar = self.query_one("#sidebar", Sidebar)
+        prefetcher.hint(sidebar.predict_next(message.session_id))
 
     async def on_session_item_selected(self, message: SessionItem.Selected) -> None:
         """Handle session selection."""
@@ -119,11 +355,18 @@ class MofishApp(App):
 
         # Update state
         session_state.set_active(session_id)
+        catch_up.mark_read(session_id)
+        warm = prefetcher.opened(session_id)
 
         # Update UI
         sidebar = self.query_one("#sidebar", Sidebar)
         sidebar.set_active(session_id)
         sidebar.clear_unread(session_id)
+        if config.use_daemon:
+            self.run_worker(
+                client.call_api("mofish_mark_read", {"session_id": session_id}),
+                exit_on_error=False,
+            )
 
         chat_log = self.query_one("#chat-log", ChatLog)
         chat_log.set_session(session_id, message.name)
@@ -132,30 +375,33 @@ class MofishApp(App):
         message_input = self.query_one("#message-input", MessageInput)
         message_input.focus_input()
 
-        # Load history
+        if warm:
+            # History is already buffered (prefetched) and rendered above
+            return
+
+        # Load history and members at once: history renders as soon as it
+        # arrives (@ mentions as QQ numbers) and names are patched in after
         try:
             is_group = session_id.startswith("group_")
             target_id = int(session_id.split("_")[1])
-            
-            history = []
+
+            members = None
             if is_group:
-                # 预加载群成员缓存，以便@显示群昵称喵～
-                await member_cache.ensure_cache(target_id)
-                history = await actions.get_group_msg_history(target_id)
+                if not member_cache.is_cached(target_id):
+                    # 预加载群成员缓存，以便@显示群昵称喵～
+                    members = asyncio.ensure_future(
+                        member_cache.ensure_cache(target_id, PRIORITY_USER)
+                    )
+                history = await actions.get_group_msg_history(target_id, PRIORITY_USER)
             else:
-                history = await actions.get_friend_msg_history(target_id)
-            
-            # Parse and add messages
-            from mofish.api.events import parse_message_event
-            
-            for msg_data in history:
-                # Inject post_type if missing (common in history API)
-                if "post_type" not in msg_data:
-                    msg_data["post_type"] = "message"
-                
-                event = parse_message_event(msg_data)
-                if event:
-                    chat_log.add_message(event)
+                history = await actions.get_friend_msg_history(target_id, PRIORITY_USER)
+
+            chat_log.show_history(session_id, parse_history(history))
+            prefetcher.mark_warm(session_id)
+
+            if members:
+                await members
+                chat_log.refresh_names(session_id)
 
         except Exception:
             pass
@@ -166,21 +412,35 @@ class MofishApp(App):
 
     def action_toggle_boss_mode(self) -> None:
         """Toggle boss mode (panic button)."""
+        pressed_at = time.perf_counter()
         self._boss_mode_active = not self._boss_mode_active
 
         boss_mode = self.query_one("#boss-mode", BossMode)
-        main_container = self.query_one("#main-container", Container)
+        app_layout = self.query_one("#app-layout")
+        chat_log = self.query_one("#chat-log", ChatLog)
 
         if self._boss_mode_active:
-            # Show boss mode, hide main content
+            # Disguise is already rendered, so this is only a display swap
             boss_mode.is_active = True
-            boss_mode.display = True
-            main_container.query_one("#app-layout").display = False
+            app_layout.display = False
+            # Store incoming messages without rendering them
+            chat_log.suspend()
         else:
             # Hide boss mode, show main content
             boss_mode.is_active = False
-            boss_mode.display = False
-            main_container.query_one("#app-layout").display = True
+            app_layout.display = True
+            # Render whatever arrived while hidden in one batch
+            self.event_handler.flush_suspended(self)
+
+        self.call_after_refresh(self._record_boss_key_latency, pressed_at)
+
+        if not self._boss_mode_active:
+            # Render the next disguise while it is hidden
+            self.call_after_refresh(boss_mode.prepare_next)
+
+    def _record_boss_key_latency(self, pressed_at: float) -> None:
+        """Record time from boss key press to the next screen refresh."""
+        self.boss_key_latencies.append((time.perf_counter() - pressed_at) * 1000)
 
     def action_escape_boss_mode(self) -> None:
         """Exit boss mode if active."""
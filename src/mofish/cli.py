@@ -0,0 +1,172 @@
+"""Headless command-line modes: ``mofish tail`` and ``mofish send``.
+
+Both go through the daemon when one is running (see ``mofish.daemon``)
+and connect to NapCat directly otherwise. Neither imports Textual.
+"""
+
+import asyncio
+import sys
+
+from mofish.api import actions
+from mofish.api.client import client
+from mofish.api.events import MessageEvent, parse_history
+from mofish.api.router import router
+from mofish.config import config
+from mofish.daemon import daemon_listening
+from mofish.state.member_cache import MEMBER_NOTICES, member_cache
+from mofish.state.session import POLICY_NORMAL, session_state
+from mofish.utils.commands import build_message_array, parse_input
+from mofish.utils.formatting import format_content, format_time, should_highlight
+
+# ANSI styles, close to the chat log's colors
+DIM = "\033[38;5;238m"
+SESSION = "\033[36m"
+SENDER = "\033[1;32m"
+CONTENT = "\033[38;5;245m"
+HIGHLIGHT = "\033[1;33m"
+RESET = "\033[0m"
+
+
+def format_line(event: MessageEvent, session_name: str, color: bool) -> str:
+    """Format a message as one terminal line."""
+    time_str = format_time(event.time)
+    content = format_content(event, event.group_id)
+    if not color:
+        return f"{time_str} [{session_name}] {event.display_name}: {content}"
+
+    content_style = HIGHLIGHT if should_highlight(event) or event.mentions_self else CONTENT
+    return (
+        f"{DIM}{time_str}{RESET} {SESSION}[{session_name}]{RESET} "
+        f"{SENDER}{event.display_name}{RESET}: {content_style}{content}{RESET}"
+    )
+
+
+def resolve_sessions(specs: list[str], names: dict[str, str]) -> list[str]:
+    """Map session IDs, bare QQ/group numbers or name fragments to session IDs."""
+    resolved: list[str] = []
+    for spec in specs:
+        if spec in names:
+            matches = [spec]
+        elif spec.isdigit():
+            matches = [sid for sid in (f"group_{spec}", f"private_{spec}") if sid in names]
+        else:
+            needle = spec.lower()
+            matches = [sid for sid, name in names.items() if needle in name.lower()]
+        if not matches:
+            raise ValueError(f"No session matches '{spec}'")
+        resolved.extend(m for m in matches if m not in resolved)
+    return resolved
+
+
+async def _connect() -> bool:
+    """Connect through the daemon if it is running, else to NapCat."""
+    config.use_daemon = await daemon_listening(config.daemon_socket)
+    if await client.connect():
+        return True
+    print("mofish: could not connect to NapCat", file=sys.stderr)
+    return False
+
+
+async def _session_names() -> dict[str, str]:
+    """Session ID -> display name for every friend and group."""
+    names: dict[str, str] = {}
+    for friend in await actions.get_friend_list():
+        session_state.add_friend(friend)
+        names[friend.session_id] = friend.display_name
+    for group in await actions.get_group_list():
+        session_state.add_group(group)
+        names[group.session_id] = group.group_name
+    return names
+
+
+async def tail(specs: list[str], history: bool, color: bool) -> int:
+    """Print messages of the selected sessions (all if none) as they arrive."""
+    if not await _connect():
+        return 1
+    session_state.load_policies(config.policy_path)
+    names = await _session_names()
+    try:
+        selected = set(resolve_sessions(specs, names))
+    except ValueError as e:
+        print(f"mofish: {e}", file=sys.stderr)
+        return 2
+
+    def wanted(session_id: str) -> bool:
+        if selected:
+            return session_id in selected
+        return session_state.get_policy(session_id) == POLICY_NORMAL
+
+    def print_message(event: MessageEvent) -> None:
+        if wanted(event.session_id):
+            name = names.get(event.session_id, event.session_id)
+            print(format_line(event, name, color), flush=True)
+
+    for session_id in sorted(selected):
+        kind, _, target = session_id.partition("_")
+        if kind == "group":
+            await member_cache.ensure_cache(int(target))
+        if history:
+            if kind == "group":
+                messages = await actions.get_group_msg_history(int(target))
+            else:
+                messages = await actions.get_friend_msg_history(int(target))
+            for event in parse_history(messages):
+                print_message(event)
+
+    client.on_event(router.route)
+    router.subscribe("message", print_message)
+    router.subscribe("notice", member_cache.on_notice, *MEMBER_NOTICES)
+    await asyncio.Future()
+    return 0
+
+
+async def send(spec: str, text: str) -> int:
+    """Send one message and print its message_id."""
+    if not await _connect():
+        return 1
+    try:
+        session_id = resolve_sessions([spec], await _session_names())[0]
+    except ValueError as e:
+        print(f"mofish: {e}", file=sys.stderr)
+        return 2
+
+    message = build_message_array(parse_input(text))
+    if not message:
+        print("mofish: nothing to send", file=sys.stderr)
+        return 2
+
+    kind, _, target = session_id.partition("_")
+    try:
+        if kind == "group":
+            result = await actions.send_group_msg(int(target), message)
+        else:
+            result = await actions.send_private_msg(int(target), message)
+    except (TimeoutError, ConnectionError) as e:
+        print(f"mofish: {e}", file=sys.stderr)
+        return 1
+    finally:
+        await client.disconnect()
+
+    if result.get("status") != "ok":
+        print(f"mofish: send failed: {result.get('wording') or result.get('message')}",
+              file=sys.stderr)
+        return 1
+    print((result.get("data") or {}).get("message_id", ""))
+    return 0
+
+
+def run_tail(specs: list[str], history: bool, color: bool | None) -> int:
+    """Entry point for ``mofish tail``."""
+    if color is None:
+        color = sys.stdout.isatty()
+    try:
+        return asyncio.run(tail(specs, history, color))
+    except KeyboardInterrupt:
+        return 0
+
+
+def run_send(spec: str, text: str) -> int:
+    """Entry point for ``mofish send`` (text "-" reads stdin)."""
+    if text == "-":
+        text = sys.stdin.read().rstrip("\n")
+    return asyncio.run(send(spec, text))
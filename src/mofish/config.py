@@ -1,6 +1,10 @@
 """Configuration management for Mofish client."""
 
 from dataclasses import dataclass, field
+from pathlib import Path
+
+# Default home of the socket, saved state and traces (owner-only)
+STATE_DIR = "~/.mofish"
 
 
 @dataclass
@@ -11,7 +15,8 @@ class Config:
     ws_host: str = "127.0.0.1"
     ws_port: int = 3001
     ws_token: str = "GKUdr5U8rbWb(*8u"
-    heartbeat_interval: int = 30000  # ms
+    heartbeat_interval: int = 30000  # ms, until NapCat reports its own
+    latency_probe_interval: float = 5.0  # Seconds between RTT probes (get_status)
 
     # Display settings
     prompt_style: str = "admin@local:~$"  # or ">>>"
@@ -25,12 +30,64 @@ class Config:
     # Your name for mention detection
     my_name: str = ""
 
+    # Background daemon (mofish daemon / mofish attach)
+    daemon_socket: str = "~/.mofish/daemon.sock"
+    use_daemon: bool = False  # UI talks to the daemon instead of NapCat
+
+    # Saved mute / ignore / archive policies
+    policy_path: str = "~/.mofish/policies.json"
+
+    # Catch-up sync of messages missed while offline or disconnected
+    checkpoint_path: str = "~/.mofish/checkpoints.json"
+    sync_window: float = 3 * 86400  # Only sessions active this recently (s) are synced
+    sync_concurrency: int = 3  # Sessions fetched at once
+    sync_history_count: int = 50  # Messages fetched per session
+    checkpoint_save_interval: float = 30.0  # Seconds between checkpoint saves
+
+    # Idle-time prefetch of sessions likely to be opened next
+    prefetch_idle_delay: float = 1.5  # Seconds without input before prefetching
+    prefetch_recent_unread: int = 3  # Most recently active unread sessions kept warm
+    prefetch_frequent: int = 5  # Most often opened sessions kept warm
+    usage_path: str = "~/.mofish/usage.json"  # Session open counts
+
+    # Flood mode: collapse sessions whose message rate spikes
+    flood_enter_rate: float = 5.0  # Messages/s that switch to collapsed rows
+    flood_exit_rate: float = 2.0  # Messages/s below which rows render normally again
+    flood_window: float = 3.0  # Seconds the rate is measured over
+
     # Message buffer size per session
     message_buffer_size: int = 100
 
     # UI display settings
     preview_length: int = 20  # Preview text truncation length
     mention_limit: int = 8    # Max @ mention suggestions
+    render_cache_sessions: int = 20  # Sessions whose rendered rows are kept for reuse
+    render_chunk_size: int = 100  # Older rows mounted per frame when a session renders
+
+    # Outgoing message settings (keep it slow enough to avoid risk control)
+    send_rate: float = 1.0  # Sustained messages per second
+    send_burst: int = 3  # Messages that may go out back-to-back
+    send_max_retries: int = 3  # Retries while disconnected (never after a timeout)
+    send_retry_delay: float = 1.0  # Initial retry backoff in seconds
+
+    # Boss key: p95 press-to-paint latency must stay under this
+    boss_key_latency_target_ms: float = 50.0
+
+    # Boss mode fake log stream
+    boss_log_rate: float = 6.0  # Lines per second while shown
+    boss_log_scrollback: int = 500  # Lines kept in the log widget
+    boss_log_prefill: int = 40  # Lines rendered before the disguise is shown
+
+    # Event-loop monitor (off by default; costs nothing when disabled)
+    loop_monitor: bool = False
+    loop_monitor_interval: float = 0.1  # Probe period in seconds
+    slow_callback_threshold: float = 0.1  # Report loop blocks longer than this (s)
+    loop_trace_path: str = "~/.mofish/loop-trace.log"  # Rotated at ~1 MB, 3 backups
+
+    # WebSocket traffic capture (gzip JSON lines; empty disables)
+    capture_path: str = ""  # Record every frame to this file
+    replay_path: str = ""  # Replay this capture instead of connecting
+    replay_speed: float = 1.0  # 1.0 = original timing, 0 = as fast as possible
 
     @property
     def ws_url(self) -> str:
@@ -38,5 +95,12 @@ class Config:
         return f"ws://{self.ws_host}:{self.ws_port}"
 
 
+def state_file(path: str) -> Path:
+    """Expand `~` in a state file path and create its directory (owner-only)."""
+    resolved = Path(path).expanduser()
+    resolved.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return resolved
+
+
 # Global config instance
 config = Config()
@@ -0,0 +1,325 @@
+"""Background daemon that owns the NapCat connection and client state.
+
+``mofish daemon`` keeps one OneBotClient connected and maintains session
+state, the member cache and message buffers while no UI is running. UIs
+attach over a Unix socket (``mofish attach``) that speaks OneBot 11:
+requests are answered by the daemon or forwarded to NapCat, and every
+NapCat event is relayed. Extra actions:
+
+- ``mofish_snapshot``: contacts, sessions, buffered messages, recalled ids
+  and cached members, so an attaching UI starts warm
+- ``mofish_mark_read``: ``{"session_id"}``, clear a session's unread count;
+  it is the open session (no unread counted) until another is marked or
+  the last UI detaches
+- ``mofish_set_policy``: ``{"session_id", "policy"}``
+
+Messages missed while NapCat was unreachable are relayed per session as
+one ``{"post_type": "mofish_caught_up", "session_id", "messages"}``
+event, oldest first, so UIs can merge them into history in order.
+
+Does not import Textual.
+"""
+
+import asyncio
+import json
+import os
+import signal
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from websockets.asyncio.client import unix_connect
+from websockets.asyncio.server import Server, ServerConnection, unix_serve
+from websockets.exceptions import ConnectionClosed
+
+from mofish.api import actions
+from mofish.api.client import PRIORITY_NORMAL, PRIORITY_USER, client
+from mofish.api.events import MessageEvent, NoticeEvent
+from mofish.api.filters import ignore_filter
+from mofish.api.router import router
+from mofish.config import STATE_DIR, config, state_file
+from mofish.state.catch_up import catch_up
+from mofish.state.member_cache import MEMBER_NOTICES, member_cache
+from mofish.state.message_store import message_store
+from mofish.state.policy import policy_filter
+from mofish.state.session import POLICY_IGNORED, session_state
+
+# Frames queued for one UI before it is considered stuck and dropped
+RELAY_QUEUE_SIZE = 10000
+
+# post_type of the relayed catch-up batches
+CAUGHT_UP_EVENT = "mofish_caught_up"
+
+
+async def daemon_listening(socket_path: str) -> bool:
+    """Whether a daemon answers on `socket_path` (a stale socket file does not)."""
+    socket_path = os.path.expanduser(socket_path)
+    if not os.path.exists(socket_path):
+        return False
+    try:
+        ws = await unix_connect(socket_path)
+    except OSError:
+        return False
+    await ws.close()
+    return True
+
+
+class MofishDaemon:
+    """Serves attached UIs from state kept warm in this process."""
+
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = os.path.expanduser(socket_path)
+        self._server: Server | None = None
+        self._uis: dict[ServerConnection, asyncio.Queue[str]] = {}
+        self._tasks: set[asyncio.Task[Any]] = set()
+        self._friends: list[dict[str, Any]] = []
+        self._groups: list[dict[str, Any]] = []
+        self._actions: dict[str, Callable[[dict[str, Any]], Awaitable[Any]]] = {
+            "mofish_snapshot": self._snapshot,
+            "mofish_mark_read": self._mark_read,
+            "mofish_set_policy": self._set_policy,
+            "get_group_member_list": self._get_group_member_list,
+        }
+
+    async def start(self) -> bool:
+        """Connect to NapCat, load contacts and start listening."""
+        if await self._already_running():
+            print(f"[ERROR] A daemon is already listening on {self.socket_path}")
+            return False
+
+        session_state.load_policies(config.policy_path)
+        ignore_filter.update(session_state.sessions_with_policy(POLICY_IGNORED))
+        client.set_frame_filter(ignore_filter)
+
+        catch_up.load(config.checkpoint_path)
+        client.on_event(self._relay)
+        client.on_event(router.route)
+        client.on_status(self._on_status)
+        router.add_prefilter("message", catch_up.observe)
+        router.add_prefilter("message", policy_filter)
+        router.subscribe("message", self._on_message)
+        router.subscribe("notice", self._on_recall, "group_recall", "friend_recall")
+        router.subscribe("notice", member_cache.on_notice, *MEMBER_NOTICES)
+        router.subscribe(
+            "notice", actions.response_cache.on_notice, *actions.INVALIDATING_NOTICES
+        )
+
+        if not await client.connect():
+            return False
+        await self._load_sessions()
+        self._spawn(catch_up.run(self._route_caught_up))
+
+        path = state_file(self.socket_path)
+        if path.parent == Path(STATE_DIR).expanduser():
+            path.parent.chmod(0o700)  # May predate owner-only creation
+        path.unlink(missing_ok=True)  # Stale socket from a daemon that died
+        # Created owner-only: a chmod after binding leaves a window open
+        umask = os.umask(0o077)
+        try:
+            self._server = await unix_serve(self._handle_ui, str(path), max_size=None)
+        finally:
+            os.umask(umask)
+        return True
+
+    async def stop(self) -> None:
+        """Stop listening and disconnect from NapCat."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        Path(self.socket_path).unlink(missing_ok=True)
+        await client.disconnect()
+        try:
+            catch_up.save(config.checkpoint_path)
+        except OSError:
+            pass
+
+    async def serve_forever(self) -> None:
+        """Start and run until cancelled."""
+        if not await self.start():
+            return
+        print(f"mofish daemon listening on {self.socket_path}")
+        try:
+            await asyncio.Future()
+        finally:
+            await self.stop()
+
+    async def _already_running(self) -> bool:
+        return await daemon_listening(self.socket_path)
+
+    async def _load_sessions(self) -> None:
+        friends = await actions.get_friend_list()
+        for friend in friends:
+            session_state.add_friend(friend)
+        groups = await actions.get_group_list()
+        for group in groups:
+            session_state.add_group(group)
+        self._friends = [asdict(f) for f in friends]
+        self._groups = [asdict(g) for g in groups]
+
+    def _relay(self, data: dict[str, Any]) -> None:
+        """Forward a NapCat event to every attached UI."""
+        if not self._uis:
+            return
+        frame = json.dumps(data, ensure_ascii=False)
+        for ws, queue in list(self._uis.items()):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self._spawn(ws.close(code=1013, reason="UI too slow"))
+
+    def _on_status(self, state: str, latency_ms: float | None) -> None:
+        if state == "reconnecting":
+            catch_up.mark_gap()
+        elif latency_ms is None:
+            # Reconnected (probes report a latency)
+            self._spawn(catch_up.run(self._route_caught_up))
+
+    def _route_caught_up(self, session_id: str, messages: list[dict[str, Any]]) -> None:
+        """Merge a session's missed messages in time order and relay them."""
+        admitted = [(data, event) for data in messages if (event := router.admit(data))]
+        if not admitted:
+            return
+        added = message_store.merge(session_id, [event for _data, event in admitted])
+        if added:
+            latest = message_store.get_messages(session_id)[-1]
+            session_state.update_last_message(
+                session_id, latest.plain_text[:config.preview_length] or "[媒体消息]"
+            )
+            if session_id != session_state.active_session_id:
+                for _ in range(added):
+                    session_state.increment_unread(session_id)
+        self._relay({
+            "post_type": CAUGHT_UP_EVENT,
+            "session_id": session_id,
+            "messages": [data for data, _event in admitted],
+        })
+
+    def _on_message(self, event: MessageEvent) -> None:
+        if not message_store.add(event):
+            return
+        preview = event.plain_text[:config.preview_length] or "[媒体消息]"
+        session_state.update_last_message(event.session_id, preview)
+        if event.session_id != session_state.active_session_id:
+            session_state.increment_unread(event.session_id)
+
+    def _on_recall(self, event: NoticeEvent) -> None:
+        message_store.recall(event.session_id, event.message_id)
+
+    async def _handle_ui(self, ws: ServerConnection) -> None:
+        queue: asyncio.Queue[str] = asyncio.Queue(maxsize=RELAY_QUEUE_SIZE)
+        self._uis[ws] = queue
+        writer = self._spawn(self._write(ws, queue))
+        try:
+            async for frame in ws:
+                try:
+                    request = json.loads(frame)
+                except json.JSONDecodeError:
+                    continue
+                self._spawn(self._answer(queue, request))
+        except ConnectionClosed:
+            pass
+        finally:
+            del self._uis[ws]
+            writer.cancel()
+            if not self._uis:
+                session_state.active_session_id = ""
+
+    async def _write(self, ws: ServerConnection, queue: asyncio.Queue[str]) -> None:
+        """Single writer per UI, so events and responses stay in order."""
+        try:
+            while True:
+                await ws.send(await queue.get())
+        except ConnectionClosed:
+            pass
+
+    async def _answer(self, queue: asyncio.Queue[str], request: dict[str, Any]) -> None:
+        action = request.get("action", "")
+        params = request.get("params") or {}
+
+        handler = self._actions.get(action)
+        try:
+            if handler:
+                response = {"status": "ok", "retcode": 0, "data": await handler(params),
+                            "message": "", "wording": ""}
+            else:
+                priority = PRIORITY_USER if action.startswith("send_") else PRIORITY_NORMAL
+                response = dict(await client.call_api(action, params, priority=priority))
+        except (TimeoutError, ConnectionError) as e:
+            response = {"status": "failed", "retcode": 1200, "data": None,
+                        "message": str(e), "wording": "NapCat 不可用"}
+        except (KeyError, ValueError, TypeError) as e:
+            response = {"status": "failed", "retcode": 1400, "data": None,
+                        "message": str(e), "wording": "参数错误"}
+
+        if "echo" in request:
+            response["echo"] = request["echo"]
+        else:
+            response.pop("echo", None)
+        try:
+            queue.put_nowait(json.dumps(response, ensure_ascii=False))
+        except asyncio.QueueFull:
+            pass
+
+    def _spawn(self, coro: Any) -> asyncio.Task[Any]:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _snapshot(self, params: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "friends": self._friends,
+            "groups": self._groups,
+            "sessions": {
+                sid: {"unread": s.unread_count, "last_message": s.last_message}
+                for sid, s in session_state.sessions.items()
+                if s.unread_count or s.last_message
+            },
+            "policies": session_state.policies,
+            "messages": {
+                sid: [e.to_onebot() for e in message_store.get_messages(sid)]
+                for sid in message_store.session_ids()
+            },
+            "recalled": {
+                sid: message_store.recalled_ids(sid) for sid in message_store.session_ids()
+            },
+            "members": {
+                str(gid): member_cache.get_members_list(gid)
+                for gid in member_cache.cached_groups()
+            },
+        }
+
+    async def _mark_read(self, params: dict[str, Any]) -> None:
+        session_state.set_active(params["session_id"])  # Also clears unread
+        catch_up.mark_read(params["session_id"])
+
+    async def _set_policy(self, params: dict[str, Any]) -> None:
+        policy_filter.apply(params["session_id"], params["policy"])
+
+    async def _get_group_member_list(self, params: dict[str, Any]) -> list[dict[str, Any]]:
+        """Served from the daemon's member cache, fetched once per group."""
+        group_id = int(params["group_id"])
+        await member_cache.ensure_cache(group_id)
+        return member_cache.get_members_list(group_id)
+
+
+async def _serve_until_signalled(daemon: MofishDaemon) -> None:
+    """Serve until SIGTERM or SIGHUP, still removing the socket and saving state."""
+    task = asyncio.ensure_future(daemon.serve_forever())
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGHUP):
+        loop.add_signal_handler(sig, task.cancel)
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def run_daemon() -> None:
+    """Run the daemon until interrupted or terminated."""
+    daemon = MofishDaemon(config.daemon_socket)
+    try:
+        asyncio.run(_serve_until_signalled(daemon))
+    except KeyboardInterrupt:
+        pass
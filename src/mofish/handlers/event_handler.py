@@ -3,9 +3,17 @@
 from typing import TYPE_CHECKING, Any
 
 from textual.app import App
+from textual.content import Content
+from textual.widgets import Static
 
-from mofish.api.events import parse_message_event
+from mofish.api.events import (
+    FriendInfo,
+    MessageEvent,
+    NoticeEvent,
+    RequestEvent,
+)
 from mofish.config import config
+from mofish.state.message_store import message_store
 from mofish.state.session import session_state
 from mofish.ui.chatlog import ChatLog
 from mofish.ui.sidebar import Sidebar
@@ -17,11 +25,25 @@ if TYPE_CHECKING:
 class EventHandler:
     """Handles incoming OneBot events."""
 
-    def handle_event(self, data: dict[str, Any], app: App) -> None:
-        """Handle incoming event data."""
-        event = parse_message_event(data)
-        if not event:
+    def __init__(self) -> None:
+        # Sessions changed while rendering was suspended (boss mode)
+        self._dirty_sessions: set[str] = set()
+
+    def handle_muted(self, session_id: str, preview: str, app: App) -> None:
+        """Show a muted session's new preview and unread count."""
+        if getattr(app, "rendering_suspended", False):
+            self._dirty_sessions.add(session_id)
             return
+        try:
+            sidebar = app.query_one("#sidebar", Sidebar)
+            sidebar.update_preview(session_id, preview)
+            sidebar.increment_unread(session_id)
+        except Exception:
+            pass
+
+    def handle_message(self, event: MessageEvent, app: App) -> None:
+        """Handle an incoming message."""
+        suspended = getattr(app, "rendering_suspended", False)
 
         try:
             # Add message to talk log
@@ -29,18 +51,106 @@ class EventHandler:
             chat_log = app.query_one("#chat-log", ChatLog)
             chat_log.add_message(event)
 
-            # Update sidebar preview
-            sidebar = app.query_one("#sidebar", Sidebar)
-            preview = event.plain_text[:config.preview_length] or "[媒体消息]"
-            sidebar.update_preview(event.session_id, preview)
-
             # Update session state
+            preview = event.plain_text[:config.preview_length] or "[媒体消息]"
             session_state.update_last_message(event.session_id, preview)
 
             # Increment unread if not active session
-            if event.session_id != session_state.active_session_id:
+            is_unread = event.session_id != session_state.active_session_id
+            if is_unread:
                 session_state.increment_unread(event.session_id)
+
+            # Sidebar catches up in flush_suspended()
+            if suspended:
+                self._dirty_sessions.add(event.session_id)
+                return
+
+            # Update sidebar preview
+            sidebar = app.query_one("#sidebar", Sidebar)
+            sidebar.update_preview(event.session_id, preview)
+            if is_unread:
                 sidebar.increment_unread(event.session_id)
 
         except Exception:
             pass
+
+    def handle_caught_up(self, session_id: str, events: list[MessageEvent], app: App) -> None:
+        """Add a session's missed messages as one batch.
+
+        They are merged into history in time order rather than appended
+        after live messages, and do not count towards flood mode.
+        """
+        try:
+            chat_log = app.query_one("#chat-log", ChatLog)
+            added = chat_log.show_history(session_id, events)
+            if not added:
+                return
+
+            latest = message_store.get_messages(session_id)[-1]
+            preview = latest.plain_text[:config.preview_length] or "[媒体消息]"
+            session_state.update_last_message(session_id, preview)
+            if session_id != session_state.active_session_id:
+                for _ in range(added):
+                    session_state.increment_unread(session_id)
+
+            if getattr(app, "rendering_suspended", False):
+                self._dirty_sessions.add(session_id)
+                return
+            session = session_state.get_session(session_id)
+            if session:
+                app.query_one("#sidebar", Sidebar).sync_session(
+                    session_id, session.unread_count, session.last_message
+                )
+        except Exception:
+            pass
+
+    def handle_recall(self, event: NoticeEvent, app: App) -> None:
+        """Mark a recalled message in the store and strike through its row."""
+        try:
+            chat_log = app.query_one("#chat-log", ChatLog)
+            chat_log.recall_message(event.session_id, event.message_id)
+        except Exception:
+            pass
+
+    def handle_friend_add(self, event: NoticeEvent, app: App) -> None:
+        """Add a newly accepted friend to the session list."""
+        session_id = f"private_{event.user_id}"
+        if session_state.get_session(session_id):
+            return
+        friend = FriendInfo(user_id=event.user_id, nickname=str(event.user_id), remark="")
+        session_state.add_friend(friend)
+        try:
+            app.query_one("#sidebar", Sidebar).add_friend(friend)
+        except Exception:
+            pass
+
+    def handle_request(self, event: RequestEvent, app: App) -> None:
+        """Surface friend / group requests in the status bar."""
+        if event.request_type == "friend":
+            text = f"好友请求: {event.user_id}"
+        else:
+            text = f"入群请求: {event.user_id} -> {event.group_id}"
+        if event.comment:
+            text += f" ({event.comment})"
+        try:
+            # Not markup: the comment is free text from the requester
+            app.query_one("#status-bar", Static).update(Content.styled(text, "#ffaa00"))
+        except Exception:
+            pass
+
+    def flush_suspended(self, app: App) -> None:
+        """Bring the UI up to date with everything stored while suspended."""
+        dirty, self._dirty_sessions = self._dirty_sessions, set()
+
+        try:
+            app.query_one("#chat-log", ChatLog).resume()
+
+            sidebar = app.query_one("#sidebar", Sidebar)
+            for session_id in dirty:
+                session = session_state.get_session(session_id)
+                if session:
+                    sidebar.sync_session(
+                        session_id, session.unread_count, session.last_message
+                    )
+        except Exception:
+            pass
@@ -1,27 +1,53 @@
 """Handler for message input submission."""
 
 import re
+import time
 from typing import TYPE_CHECKING, Any
 
 from textual.app import App
+from textual.content import Content
 from textual.widgets import Static
 
-from mofish.api import actions
 from mofish.api.events import create_self_message
+from mofish.api.outbox import OutgoingMessage, outbox
 from mofish.state.member_cache import member_cache
-from mofish.state.session import session_state
+from mofish.state.session import (
+    POLICY_ARCHIVED,
+    POLICY_IGNORED,
+    POLICY_MUTED,
+    POLICY_NORMAL,
+    session_state,
+)
 from mofish.ui.chatlog import ChatLog
+from mofish.ui.stats_panel import StatsPanel
 from mofish.utils.commands import build_message_array, parse_input
+from mofish.utils.metrics import metrics
 
 if TYPE_CHECKING:
     from mofish.app import MofishApp
 
+# Slash commands that toggle a policy on the current session
+POLICY_COMMANDS = {
+    "/mute": POLICY_MUTED,
+    "/ignore": POLICY_IGNORED,
+    "/archive": POLICY_ARCHIVED,
+}
+
 
 class InputHandler:
     """Handles message input submission logic."""
 
     async def handle_submit(self, text: str, app: App) -> None:
         """Handle submitted message text."""
+        # Local commands never reach the network
+        command = text.split(" ", 1)[0]
+        if command == "/stats":
+            self._handle_stats_command(text, app)
+            return
+        if command in POLICY_COMMANDS and text.strip() == command:
+            self._handle_policy_command(POLICY_COMMANDS[command], app)
+            return
+
         session = session_state.get_active_session()
         if not session:
             return
@@ -44,28 +70,81 @@ class InputHandler:
             # 将 @QQ号 替换为群昵称，/reply 消息ID 替换为发送者昵称喵～
             display_text = self._replace_qq_with_nickname(text, session.target_id, app)
 
-        # Send message
+        # Queue message; the outbox sends it in the background
+        item = outbox.enqueue(
+            session.session_id, session.is_group, session.target_id, msg_array
+        )
+
+        # Optimistic local echo, patched with the real message_id on ack
+        self_msg = create_self_message(
+            display_text, session.session_id, "我", message_id=item.local_id
+        )
         try:
-            if session.is_group:
-                await actions.send_group_msg(session.target_id, msg_array)
-            else:
-                await actions.send_private_msg(session.target_id, msg_array)
+            chat_log = app.query_one("#chat-log", ChatLog)
+            chat_log.add_message(self_msg)
+        except Exception:
+            pass
 
-            # Add local echo (show our own message)
-            self_msg = create_self_message(display_text, session.session_id, "我")
-            try:
-                chat_log = app.query_one("#chat-log", ChatLog)
-                chat_log.add_message(self_msg)
-            except Exception:
-                pass
+    def handle_send_ack(self, item: OutgoingMessage, message_id: int, app: App) -> None:
+        """Replace the pending echo's placeholder id with the real one."""
+        try:
+            chat_log = app.query_one("#chat-log", ChatLog)
+            chat_log.ack_message(item.session_id, item.local_id, message_id)
+        except Exception:
+            pass
+
+    def handle_send_failed(self, item: OutgoingMessage, error: Exception, app: App) -> None:
+        """Mark the pending echo as failed and report the error."""
+        try:
+            chat_log = app.query_one("#chat-log", ChatLog)
+            chat_log.fail_message(item.session_id, item.local_id)
+        except Exception:
+            pass
+
+        try:
+            status = app.query_one("#status-bar", Static)
+            status.update(Content.styled(f"Send failed: {error}", "#ff4444"))
+        except Exception:
+            pass
 
+    def _handle_stats_command(self, text: str, app: App) -> None:
+        """Toggle the metrics panel, or export metrics with `/stats export [path]`."""
+        args = text.split()[1:]
+        try:
+            if args and args[0] == "export":
+                path = args[1] if len(args) > 1 else time.strftime(
+                    "mofish-stats-%Y%m%d-%H%M%S.json"
+                )
+                written = metrics.export(path)
+                app.query_one("#status-bar", Static).update(
+                    Content.styled(f"Metrics exported to {written}", "#00ff00")
+                )
+            else:
+                panel = app.query_one("#stats-panel", StatsPanel)
+                panel.is_visible = not panel.is_visible
         except Exception as e:
             try:
-                status = app.query_one("#status-bar", Static)
-                status.update(f"[#ff4444]Send failed: {e}[/]")
+                app.query_one("#status-bar", Static).update(Content.styled(str(e), "#ff4444"))
             except Exception:
                 pass
 
+    def _handle_policy_command(self, policy: str, app: "MofishApp") -> None:
+        """Toggle a mute / ignore / archive policy on the current session."""
+        session = session_state.get_active_session()
+        if not session:
+            return
+
+        if session.policy == policy:
+            policy = POLICY_NORMAL
+        app.set_session_policy(session.session_id, policy)
+
+        try:
+            app.query_one("#status-bar", Static).update(
+                Content.styled(f"{session.name}: {policy}", "#00ff00")
+            )
+        except Exception:
+            pass
+
     def _replace_qq_with_nickname(self, text: str, group_id: int, app: App) -> str:
         """将文本中的 @QQ号 替换为群昵称，/reply 消息ID 替换为发送者昵称."""
         from mofish.ui.chatlog import ChatLog
@@ -1,10 +1,64 @@
 """Main entry point for Mofish client."""
 
-from mofish.app import MofishApp
+import argparse
+import sys
+
+from mofish.config import config
 
 
 def main() -> None:
-    """Run the Mofish application."""
+    """Run the Mofish application (or the daemon)."""
+    parser = argparse.ArgumentParser(prog="mofish")
+    parser.add_argument("--record", metavar="PATH", help="record WebSocket traffic to a capture file")
+    parser.add_argument("--replay", metavar="PATH", help="replay a capture file instead of connecting")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed multiplier (0 = as fast as possible)")
+    parser.add_argument("--socket", metavar="PATH", help=f"daemon socket (default {config.daemon_socket})")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("daemon", help="run in the background, owning the NapCat connection")
+    commands.add_parser("attach", help="open the UI on a running daemon")
+    tail = commands.add_parser("tail", help="stream messages to stdout without the UI")
+    tail.add_argument("sessions", nargs="*",
+                      help="session IDs, QQ/group numbers or name fragments (default: all)")
+    tail.add_argument("--history", action="store_true",
+                      help="print recent history of the selected sessions first")
+    tail.add_argument("--color", action=argparse.BooleanOptionalAction, default=None,
+                      help="colorize output (default: when stdout is a terminal)")
+    send = commands.add_parser("send", help="send one message and exit")
+    send.add_argument("session", help="session ID, QQ/group number or name fragment")
+    send.add_argument("text", nargs="+", help="message text, supports @QQ and /reply; - reads stdin")
+    args = parser.parse_args()
+
+    if args.record:
+        config.capture_path = args.record
+    if args.replay:
+        config.replay_path = args.replay
+        config.replay_speed = args.speed
+    if args.socket:
+        config.daemon_socket = args.socket
+
+    # Imported lazily so the daemon and CLI modes never load Textual
+    if args.command == "daemon":
+        from mofish.daemon import run_daemon
+
+        run_daemon()
+        return
+
+    if args.command == "tail":
+        from mofish.cli import run_tail
+
+        sys.exit(run_tail(args.sessions, args.history, args.color))
+
+    if args.command == "send":
+        from mofish.cli import run_send
+
+        sys.exit(run_send(args.session, " ".join(args.text)))
+
+    if args.command == "attach":
+        config.use_daemon = True
+
+    from mofish.app import MofishApp
+
     app = MofishApp()
     app.run()
 
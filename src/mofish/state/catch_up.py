@@ -0,0 +1,227 @@
+"""Catch-up sync of messages missed while offline or disconnected."""
+
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable
+
+from mofish.api import actions
+from mofish.api.client import PRIORITY_BACKGROUND
+from mofish.api.events import history_messages, raw_mentions_self, raw_session_id
+from mofish.config import config, state_file
+from mofish.state.session import POLICY_IGNORED, session_state
+from mofish.utils.metrics import metrics
+
+
+@dataclass
+class Checkpoint:
+    """Newest message seen in a session."""
+
+    time: int = 0
+    ids: list[int] = field(default_factory=list)  # Message IDs seen at `time`
+    count: int = 0  # Messages seen so far, ranks busy sessions first
+    mentioned: bool = False  # An @ of us arrived and the session wasn't opened since
+
+    def is_newer(self, data: dict[str, Any]) -> bool:
+        """Whether a raw message event comes after this checkpoint."""
+        message_time = data.get("time", 0)
+        if message_time != self.time:
+            return message_time > self.time
+        return data.get("message_id", 0) not in self.ids
+
+
+class CatchUpSync:
+    """Tracks per-session checkpoints and fetches what was missed.
+
+    `observe` runs as a router prefilter on every message, so checkpoints
+    follow live traffic. From startup (or a disconnect) until the next
+    `run`, the checkpoints to sync from stay frozen and live message IDs
+    are remembered, so messages that arrive live while history is being
+    fetched are not counted twice.
+    """
+
+    def __init__(self) -> None:
+        self._checkpoints: dict[str, Checkpoint] = {}
+        # Checkpoints as of the gap being synced, None while caught up
+        self._frozen: dict[str, Checkpoint] | None = {}
+        # Checkpoints of a gap that started while the previous one was syncing
+        self._next_frozen: dict[str, Checkpoint] | None = None
+        # session_id -> message IDs received live since the gap started
+        self._seen: dict[str, set[int]] = {}
+        self._running = False
+        self._last_save = time.monotonic()
+        self._path = ""
+        self._fetched = metrics.counter("sync.messages")
+        self._synced = metrics.counter("sync.sessions")
+
+    def load(self, path: str) -> None:
+        """Load saved checkpoints (missing or broken file means none)."""
+        self._path = path
+        try:
+            data = json.loads(Path(path).expanduser().read_text(encoding="utf-8"))
+            self._checkpoints = {sid: Checkpoint(**cp) for sid, cp in data.items()}
+        except (OSError, ValueError, TypeError):
+            self._checkpoints = {}
+        self._frozen = self._snapshot()
+
+    def save(self, path: str | None = None) -> None:
+        """Persist checkpoints."""
+        path = path or self._path
+        if not path:
+            return
+        self._last_save = time.monotonic()
+        state_file(path).write_text(
+            json.dumps({sid: asdict(cp) for sid, cp in self._checkpoints.items()}),
+            encoding="utf-8",
+        )
+
+    def observe(self, data: dict[str, Any]) -> bool:
+        """Advance the checkpoint of a raw message event (router prefilter).
+
+        Always returns True: this only watches traffic.
+        """
+        session_id = raw_session_id(data)
+        message_time = data.get("time", 0)
+        message_id = data.get("message_id", 0)
+
+        checkpoint = self._checkpoints.get(session_id)
+        if checkpoint is None:
+            checkpoint = self._checkpoints[session_id] = Checkpoint()
+        if message_time > checkpoint.time:
+            checkpoint.time = message_time
+            checkpoint.ids = [message_id]
+        elif message_time == checkpoint.time and message_id not in checkpoint.ids:
+            checkpoint.ids.append(message_id)
+        checkpoint.count += 1
+        if session_id != session_state.active_session_id and raw_mentions_self(data):
+            checkpoint.mentioned = True
+
+        if self._frozen is not None or self._next_frozen is not None:
+            self._seen.setdefault(session_id, set()).add(message_id)
+
+        if self._path and time.monotonic() - self._last_save > config.checkpoint_save_interval:
+            try:
+                self.save()
+            except OSError:
+                pass
+        return True
+
+    def mark_read(self, session_id: str) -> None:
+        """Forget a pending mention once the session is opened."""
+        checkpoint = self._checkpoints.get(session_id)
+        if checkpoint:
+            checkpoint.mentioned = False
+
+    def mark_gap(self) -> None:
+        """Freeze the checkpoints to sync from (connection lost)."""
+        if self._running:
+            if self._next_frozen is None:
+                self._next_frozen = self._snapshot()
+        elif self._frozen is None:
+            self._frozen = self._snapshot()
+            self._seen = {}
+
+    def plan(self) -> list[str]:
+        """Sessions to sync, most important first.
+
+        Recently active sessions only: the open one, then those with an
+        unread mention, then the busiest.
+        """
+        checkpoints = self._frozen or {}
+        cutoff = time.time() - config.sync_window
+        active = session_state.active_session_id
+        candidates = [
+            sid for sid, cp in checkpoints.items()
+            if cp.time >= cutoff
+            and sid in session_state.sessions
+            and session_state.get_policy(sid) != POLICY_IGNORED
+        ]
+        return sorted(
+            candidates,
+            key=lambda sid: (
+                sid != active,
+                not self._checkpoints[sid].mentioned,
+                -self._checkpoints[sid].count,
+            ),
+        )
+
+    async def run(self, route: Callable[[str, list[dict[str, Any]]], None]) -> int:
+        """Fetch messages newer than each checkpoint and feed them to `route`.
+
+        `route` gets each session's missed messages as one batch, oldest
+        first, so they can be merged into history in order rather than
+        appended after live traffic. Sessions are fetched
+        `config.sync_concurrency` at a time at background priority. Only
+        the newest `config.sync_history_count` messages of a session are
+        fetched. Returns the number of messages routed.
+        """
+        if self._running or self._frozen is None:
+            return 0
+        self._running = True
+        checkpoints = self._frozen
+        queue = deque(self.plan())
+        routed = 0
+
+        async def worker() -> None:
+            nonlocal routed
+            while queue:
+                session_id = queue.popleft()
+                seen = self._seen.get(session_id, ())
+                missed = [
+                    data for data in await self._fetch(session_id)
+                    # Skip what arrived live in the meantime
+                    if data.get("message_id") not in seen
+                    and checkpoints[session_id].is_newer(data)
+                ]
+                if missed:
+                    missed.sort(key=lambda data: data.get("time", 0))
+                    route(session_id, missed)
+                    routed += len(missed)
+                self._synced.inc()
+
+        workers = [
+            asyncio.ensure_future(worker()) for _ in range(max(1, config.sync_concurrency))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # If one worker failed, the others must not keep routing after run()
+            for task in workers:
+                task.cancel()
+            self._running = False
+            # A disconnect during the sync leaves another gap to sync
+            self._frozen, self._next_frozen = self._next_frozen, None
+            if self._frozen is None:
+                self._seen = {}
+            self._fetched.inc(routed)
+
+        try:
+            self.save()
+        except OSError:
+            pass
+        return routed
+
+    def _snapshot(self) -> dict[str, Checkpoint]:
+        return {sid: replace(cp, ids=list(cp.ids)) for sid, cp in self._checkpoints.items()}
+
+    async def _fetch(self, session_id: str) -> list[dict[str, Any]]:
+        kind, _, target = session_id.partition("_")
+        try:
+            if kind == "group":
+                messages = await actions.get_group_msg_history(
+                    int(target), PRIORITY_BACKGROUND, config.sync_history_count
+                )
+            else:
+                messages = await actions.get_friend_msg_history(
+                    int(target), PRIORITY_BACKGROUND, config.sync_history_count
+                )
+        except (TimeoutError, ConnectionError, ValueError):
+            return []
+        return history_messages(messages)
+
+
+# Global catch-up instance
+catch_up = CatchUpSync()
@@ -3,6 +3,9 @@
 from typing import Any
 
 from mofish.api import actions
+from mofish.api.client import PRIORITY_NORMAL
+from mofish.api.events import NoticeEvent
+from mofish.utils.metrics import metrics
 
 
 class MemberCacheService:
@@ -11,20 +14,64 @@ class MemberCacheService:
     def __init__(self) -> None:
         # group_id -> {user_id -> member_info}
         self._cache: dict[int, dict[int, dict[str, Any]]] = {}
+        # group_id -> 成员名称变动次数（渲染缓存据此判断是否过期）
+        self._generations: dict[int, int] = {}
 
-    async def ensure_cache(self, group_id: int) -> None:
+    async def ensure_cache(self, group_id: int, priority: int = PRIORITY_NORMAL) -> None:
         """确保指定群的成员缓存已加载."""
         if group_id in self._cache:
+            metrics.counter("member_cache.hits").inc()
             return
 
+        metrics.counter("member_cache.misses").inc()
+
         try:
-            members = await actions.get_group_member_list(group_id)
-            self._cache[group_id] = {
-                m.get("user_id", 0): m for m in members
-            }
+            members = await actions.get_group_member_list(group_id, priority)
+            self.set_members(group_id, members)
         except Exception:
             self._cache[group_id] = {}
 
+    def set_members(self, group_id: int, members: list[dict[str, Any]]) -> None:
+        """直接写入某群的成员列表（如来自守护进程的快照）."""
+        self._cache[group_id] = {
+            m.get("user_id", 0): m for m in members
+        }
+        self._bump(group_id)
+
+    def generation(self, group_id: int | None) -> int:
+        """该群成员名称的版本号，每次变动后递增."""
+        return self._generations.get(group_id or 0, 0)
+
+    def _bump(self, group_id: int) -> None:
+        self._generations[group_id] = self._generations.get(group_id, 0) + 1
+
+    def is_cached(self, group_id: int) -> bool:
+        """该群的成员缓存是否已加载."""
+        return group_id in self._cache
+
+    def cached_groups(self) -> list[int]:
+        """已加载成员缓存的群号."""
+        return list(self._cache)
+
+    def on_notice(self, event: NoticeEvent) -> None:
+        """根据成员变动通知增量更新已加载的缓存."""
+        members = self._cache.get(event.group_id or 0)
+        if members is None:
+            return
+
+        if event.notice_type == "group_decrease":
+            if event.user_id == event.data.get("self_id"):
+                # 自己退群/被踢，整个群缓存作废
+                del self._cache[event.group_id]
+            else:
+                members.pop(event.user_id, None)
+        elif event.notice_type == "group_increase":
+            members.setdefault(event.user_id, {"user_id": event.user_id})
+        elif event.notice_type == "group_card":
+            member = members.setdefault(event.user_id, {"user_id": event.user_id})
+            member["card"] = event.data.get("card_new", "")
+        self._bump(event.group_id)
+
     def get_display_name(self, group_id: int, user_id: int | str) -> str | None:
         """获取群成员显示名称（群名片 > 昵称），未找到返回 None."""
         if group_id not in self._cache:
@@ -59,10 +106,16 @@ class MemberCacheService:
     def clear_cache(self, group_id: int | None = None) -> None:
         """清除缓存，可指定群或清除全部."""
         if group_id is None:
+            for cached in self._cache:
+                self._bump(cached)
             self._cache.clear()
         elif group_id in self._cache:
             del self._cache[group_id]
+            self._bump(group_id)
+
 
+# 会改变成员缓存的通知类型
+MEMBER_NOTICES = ("group_increase", "group_decrease", "group_card")
 
 # 全局单例
 member_cache = MemberCacheService()
@@ -0,0 +1,110 @@
+"""Per-session message buffers, independent of the UI."""
+
+from collections import deque
+
+from mofish.api.events import MessageEvent
+from mofish.config import config
+
+
+class MessageStore:
+    """Keeps the most recent messages of every session."""
+
+    def __init__(self) -> None:
+        self._messages: dict[str, deque[MessageEvent]] = {}
+        # session_id -> message_id -> buffered event
+        self._index: dict[str, dict[int, MessageEvent]] = {}
+        # session_id -> ids recalled so far (kept even after eviction)
+        self._recalled: dict[str, set[int]] = {}
+
+    def add(self, event: MessageEvent) -> bool:
+        """Append a message to its session buffer.
+
+        Returns False if a message with the same ID is already buffered
+        (e.g. history reloaded over live messages).
+        """
+        session_id = event.session_id
+        buffer = self._messages.get(session_id)
+        if buffer is None:
+            buffer = self._messages[session_id] = deque(maxlen=config.message_buffer_size)
+            self._index[session_id] = {}
+        index = self._index[session_id]
+
+        if event.message_id and event.message_id in index:
+            return False
+        if event.message_id in self._recalled.get(session_id, ()):
+            event.recalled = True
+
+        if len(buffer) == buffer.maxlen:
+            evicted = buffer[0]
+            if index.get(evicted.message_id) is evicted:
+                del index[evicted.message_id]
+        buffer.append(event)
+        if event.message_id:
+            index[event.message_id] = event
+        return True
+
+    def merge(self, session_id: str, events: list[MessageEvent]) -> int:
+        """Add fetched history, keeping the session buffer in time order.
+
+        Returns how many messages were new.
+        """
+        buffer = self._messages.get(session_id)
+        added = 0
+        for event in sorted(events, key=lambda e: e.time):
+            if buffer is not None and len(buffer) == buffer.maxlen and (
+                event.time < buffer[0].time
+            ):
+                continue  # Older than everything kept
+            added += self.add(event)
+            buffer = self._messages[session_id]
+        if added and buffer is not None:
+            ordered = sorted(buffer, key=lambda e: e.time)
+            buffer.clear()
+            buffer.extend(ordered)
+        return added
+
+    def get_messages(self, session_id: str) -> list[MessageEvent]:
+        """Get buffered messages of a session, oldest first."""
+        return list(self._messages.get(session_id, ()))
+
+    def session_ids(self) -> list[str]:
+        """Sessions that have buffered messages."""
+        return list(self._messages)
+
+    def recalled_ids(self, session_id: str) -> list[int]:
+        """Message IDs recalled in a session."""
+        return sorted(self._recalled.get(session_id, ()))
+
+    def get_message(self, session_id: str, message_id: int) -> MessageEvent | None:
+        """Find a buffered message by ID."""
+        return self._index.get(session_id, {}).get(message_id)
+
+    def reassign_id(self, session_id: str, old_id: int, new_id: int) -> MessageEvent | None:
+        """Give a buffered message a new ID (local echo acked by the server)."""
+        index = self._index.get(session_id, {})
+        event = index.pop(old_id, None)
+        if event:
+            event.message_id = new_id
+            index[new_id] = event
+        return event
+
+    def recall(self, session_id: str, message_id: int) -> MessageEvent | None:
+        """Mark a message as recalled; returns it if it is buffered."""
+        self._recalled.setdefault(session_id, set()).add(message_id)
+        event = self.get_message(session_id, message_id)
+        if event:
+            event.recalled = True
+        return event
+
+    def clear(self, session_id: str | None = None) -> None:
+        """Clear one session buffer, or all of them."""
+        if session_id is None:
+            self._messages.clear()
+            self._index.clear()
+        else:
+            self._messages.pop(session_id, None)
+            self._index.pop(session_id, None)
+
+
+# Global store instance
+message_store = MessageStore()
@@ -0,0 +1,81 @@
+"""Session policies applied to live traffic, shared by the UI and the daemon."""
+
+from typing import Any, Callable
+
+from mofish.api.events import raw_preview, raw_session_id
+from mofish.api.filters import ignore_filter
+from mofish.config import config
+from mofish.state.message_store import message_store
+from mofish.state.session import (
+    POLICY_ARCHIVED,
+    POLICY_IGNORED,
+    POLICY_MUTED,
+    POLICY_NORMAL,
+    session_state,
+)
+
+
+class PolicyFilter:
+    """Applies mute / ignore / archive policies to raw message events.
+
+    Called as a router prefilter. The open session always passes; a muted
+    session only gets its unread counter and preview updated, straight
+    from raw_message; new activity brings an archived session back.
+    """
+
+    def __init__(self) -> None:
+        self._change_handlers: list[Callable[[str, str], None]] = []
+        self._muted_handlers: list[Callable[[str, str], None]] = []
+
+    def on_change(self, handler: Callable[[str, str], None]) -> None:
+        """Register a handler called with (session_id, policy) once applied."""
+        self._change_handlers.append(handler)
+
+    def on_muted(self, handler: Callable[[str, str], None]) -> None:
+        """Register a handler called with (session_id, preview) per muted message."""
+        self._muted_handlers.append(handler)
+
+    def apply(self, session_id: str, policy: str) -> None:
+        """Set, persist and enforce a session's policy."""
+        session_state.set_policy(session_id, policy)
+        try:
+            session_state.save_policies(config.policy_path)
+        except OSError:
+            pass
+        ignore_filter.update(session_state.sessions_with_policy(POLICY_IGNORED))
+        if policy in (POLICY_MUTED, POLICY_IGNORED) and (
+            session_id != session_state.active_session_id
+        ):
+            message_store.clear(session_id)
+        self._notify(self._change_handlers, session_id, policy)
+
+    def __call__(self, data: dict[str, Any]) -> bool:
+        """Whether a raw message event should be parsed and stored."""
+        session_id = raw_session_id(data)
+        policy = session_state.get_policy(session_id)
+        if policy == POLICY_NORMAL or session_id == session_state.active_session_id:
+            return True
+
+        if policy == POLICY_ARCHIVED:
+            self.apply(session_id, POLICY_NORMAL)
+            return True
+
+        if policy == POLICY_MUTED:
+            preview = raw_preview(data, config.preview_length)
+            session_state.update_last_message(session_id, preview)
+            session_state.increment_unread(session_id)
+            self._notify(self._muted_handlers, session_id, preview)
+
+        # Ignored frames normally never get this far (see IgnoreFilter)
+        return False
+
+    def _notify(self, handlers: list[Callable[..., None]], *args: Any) -> None:
+        for handler in handlers:
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"[ERROR] Policy handler error: {e}")
+
+
+# Global policy filter instance
+policy_filter = PolicyFilter()
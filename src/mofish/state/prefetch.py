@@ -0,0 +1,166 @@
+"""Idle-time prefetch of history and member lists for likely-next sessions."""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from mofish.api import actions
+from mofish.api.client import PRIORITY_BACKGROUND
+from mofish.api.events import MessageEvent, parse_history
+from mofish.config import config, state_file
+from mofish.state.member_cache import member_cache
+from mofish.state.message_store import message_store
+from mofish.state.session import POLICY_NORMAL, session_state
+from mofish.utils.metrics import metrics
+
+
+class Prefetcher:
+    """Warms the sessions the user is likely to open next.
+
+    Candidates, best first: the session focused in the sidebar and the
+    one focus is moving towards, the most recently active unread
+    sessions, then the most often opened ones. Prefetching starts after
+    `config.prefetch_idle_delay` seconds without input, runs at
+    background priority and is cancelled by `touch`.
+
+    A warm session has its history in `message_store`, kept current by
+    live events, so opening it needs no history request.
+    """
+
+    def __init__(self) -> None:
+        self._hints: list[str] = []
+        self._unread: OrderedDict[str, None] = OrderedDict()
+        self._opens: dict[str, int] = {}
+        self._warm: set[str] = set()
+        self._failed: set[str] = set()
+        self._last_input = time.monotonic()
+        self._task: asyncio.Task[None] | None = None
+        self._hits = metrics.counter("prefetch.hits")
+        self._misses = metrics.counter("prefetch.misses")
+        self._warmed = metrics.counter("prefetch.sessions")
+        self._cancelled = metrics.counter("prefetch.cancelled")
+
+    def load(self, path: str) -> None:
+        """Load saved open counts (missing or broken file means none)."""
+        try:
+            data = json.loads(Path(path).expanduser().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self._opens = {sid: int(count) for sid, count in data.items()}
+
+    def save(self, path: str) -> None:
+        """Persist open counts."""
+        state_file(path).write_text(json.dumps(self._opens), encoding="utf-8")
+
+    def touch(self) -> None:
+        """Foreground activity: stop prefetching until idle again."""
+        self._last_input = time.monotonic()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            self._cancelled.inc()
+            self._task = None
+        self._schedule()
+
+    def hint(self, session_ids: list[str]) -> None:
+        """Sessions the sidebar focus is on or heading to."""
+        self._hints = session_ids
+        self._schedule()
+
+    def on_message(self, event: MessageEvent) -> None:
+        """Track recently active unread sessions (router handler)."""
+        session_id = event.session_id
+        if session_id == session_state.active_session_id:
+            return
+        self._unread[session_id] = None
+        self._unread.move_to_end(session_id)
+        while len(self._unread) > config.prefetch_recent_unread:
+            self._unread.popitem(last=False)
+        if session_id not in self._warm:
+            self._schedule()
+
+    def opened(self, session_id: str) -> bool:
+        """Record a session being opened; True if its history is warm."""
+        self._opens[session_id] = self._opens.get(session_id, 0) + 1
+        self._unread.pop(session_id, None)
+        self.touch()
+        if session_id in self._warm:
+            self._hits.inc()
+            return True
+        self._misses.inc()
+        return False
+
+    def mark_warm(self, session_id: str) -> None:
+        """History of a session was loaded by someone else."""
+        self._warm.add(session_id)
+
+    def forget(self, session_id: str) -> None:
+        """A session's buffer may have fallen behind (its traffic was filtered)."""
+        self._warm.discard(session_id)
+
+    def invalidate(self) -> None:
+        """Forget warm sessions (events may have been missed)."""
+        self._warm.clear()
+        self._failed.clear()
+
+    def _next(self) -> str | None:
+        """Best candidate that still needs prefetching."""
+        frequent = sorted(self._opens, key=self._opens.__getitem__, reverse=True)
+        candidates = [
+            *self._hints,
+            *reversed(self._unread),
+            *frequent[:config.prefetch_frequent],
+        ]
+        for session_id in candidates:
+            if (
+                session_id == session_state.active_session_id
+                or session_id in self._warm
+                or session_id in self._failed
+                or session_id not in session_state.sessions
+                or session_state.get_policy(session_id) != POLICY_NORMAL
+            ):
+                continue
+            return session_id
+        return None
+
+    def _schedule(self) -> None:
+        if (self._task is None or self._task.done()) and self._next() is not None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            idle = time.monotonic() - self._last_input
+            if idle < config.prefetch_idle_delay:
+                await asyncio.sleep(config.prefetch_idle_delay - idle)
+                continue
+            session_id = self._next()
+            if session_id is None:
+                return
+            await self._prefetch(session_id)
+
+    async def _prefetch(self, session_id: str) -> None:
+        kind, _, target = session_id.partition("_")
+        try:
+            if kind == "group":
+                group_id = int(target)
+                if not member_cache.is_cached(group_id):
+                    # Fetched directly: ensure_cache would remember a failure as
+                    # an empty member list until restart
+                    members = await actions.get_group_member_list(group_id, PRIORITY_BACKGROUND)
+                    member_cache.set_members(group_id, members)
+                history = await actions.get_group_msg_history(group_id, PRIORITY_BACKGROUND)
+            else:
+                history = await actions.get_friend_msg_history(int(target), PRIORITY_BACKGROUND)
+        except Exception:
+            # Best effort: any failure just skips the session until invalidate()
+            self._failed.add(session_id)
+            return
+
+        message_store.merge(session_id, parse_history(history))
+        self._warm.add(session_id)
+        self._warmed.inc()
+
+
+# Global prefetcher instance
+prefetcher = Prefetcher()
@@ -1,8 +1,18 @@
 """Session state management."""
 
+import json
 from dataclasses import dataclass, field
+from pathlib import Path
 
 from mofish.api.events import FriendInfo, GroupInfo
+from mofish.config import state_file
+
+# Per-session traffic policies
+POLICY_NORMAL = "normal"
+POLICY_MUTED = "muted"  # Only the unread counter and last preview are kept
+POLICY_IGNORED = "ignored"  # Frames are dropped before they are decoded
+POLICY_ARCHIVED = "archived"  # Hidden from the sidebar until the next message
+POLICIES = (POLICY_NORMAL, POLICY_MUTED, POLICY_IGNORED, POLICY_ARCHIVED)
 
 
 @dataclass
@@ -15,6 +25,7 @@ class Session:
     target_id: int  # user_id or group_id
     unread_count: int = 0
     last_message: str = ""
+    policy: str = POLICY_NORMAL
 
 
 @dataclass
@@ -23,6 +34,8 @@ class SessionState:
 
     sessions: dict[str, Session] = field(default_factory=dict)
     active_session_id: str = ""
+    # Non-normal policies, also for sessions that are not loaded yet
+    policies: dict[str, str] = field(default_factory=dict)
 
     def add_session(
         self, session_id: str, name: str, is_group: bool, target_id: int
@@ -33,6 +46,7 @@ class SessionState:
             name=name,
             is_group=is_group,
             target_id=target_id,
+            policy=self.policies.get(session_id, POLICY_NORMAL),
         )
         self.sessions[session.session_id] = session
         return session
@@ -71,6 +85,11 @@ class SessionState:
         if session_id in self.sessions:
             self.sessions[session_id].unread_count += 1
 
+    def clear_unread(self, session_id: str) -> None:
+        """Reset the unread count of a session."""
+        if session_id in self.sessions:
+            self.sessions[session_id].unread_count = 0
+
     def update_last_message(self, session_id: str, message: str) -> None:
         """Update last message preview."""
         from mofish.config import config
@@ -78,6 +97,45 @@ class SessionState:
         if session_id in self.sessions:
             self.sessions[session_id].last_message = message[:config.preview_length]
 
+    def get_policy(self, session_id: str) -> str:
+        """Get the traffic policy of a session."""
+        return self.policies.get(session_id, POLICY_NORMAL)
+
+    def set_policy(self, session_id: str, policy: str) -> None:
+        """Set the traffic policy of a session."""
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy: {policy}")
+        if policy == POLICY_NORMAL:
+            self.policies.pop(session_id, None)
+        else:
+            self.policies[session_id] = policy
+        if session_id in self.sessions:
+            self.sessions[session_id].policy = policy
+
+    def sessions_with_policy(self, policy: str) -> list[str]:
+        """Session IDs that have the given policy."""
+        return [sid for sid, p in self.policies.items() if p == policy]
+
+    def load_policies(self, path: str) -> None:
+        """Load saved policies (missing or broken file means none)."""
+        try:
+            data = json.loads(Path(path).expanduser().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self.policies = {
+            sid: policy for sid, policy in data.items()
+            if policy in POLICIES and policy != POLICY_NORMAL
+        }
+        for sid, policy in self.policies.items():
+            if sid in self.sessions:
+                self.sessions[sid].policy = policy
+
+    def save_policies(self, path: str) -> None:
+        """Persist policies."""
+        state_file(path).write_text(
+            json.dumps(self.policies, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+
 
 # Global state instance
 session_state = SessionState()
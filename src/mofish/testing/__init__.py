@@ -0,0 +1 @@
+"""Offline test and benchmark helpers (fake NapCat server, synthetic data)."""
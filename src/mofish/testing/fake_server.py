@@ -0,0 +1,375 @@
+"""Fake NapCat (OneBot 11 WebSocket) server over synthetic data.
+
+Implements the actions used by ``mofish.api.actions`` and pushes message
+events at a configurable rate, with optional latency, dropped responses and
+forced disconnects. Run standalone with::
+
+    python -m mofish.testing.fake_server --groups 50 --rate 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from websockets.asyncio.server import Server, ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+from mofish.testing.synthetic import SyntheticAccount
+
+
+@dataclass
+class FakeServerOptions:
+    """Fake server settings."""
+
+    host: str = "127.0.0.1"
+    port: int = 0  # 0 picks a free port
+    token: str = ""  # Required Bearer token, empty to accept anything
+    groups: int = 20
+    friends: int = 50
+    members_per_group: int = 200
+    event_rate: float = 0.0  # Message events per second across all sessions
+    message_size: int = 20  # Characters of text per message
+    private_ratio: float = 0.1  # Share of events that are private messages
+    latency: float = 0.0  # Mean response latency in seconds
+    jitter: float = 0.0  # Uniform +/- latency jitter in seconds
+    drop_rate: float = 0.0  # Fraction of responses never sent
+    disconnect_after: float = 0.0  # Close each connection after N seconds (0 = never)
+    history_size: int = 100  # Messages kept per session for history actions
+    heartbeat: float = 0.0  # Seconds between meta_event heartbeats (0 = none)
+    frozen: bool = False  # Accept frames but never answer (half-open socket)
+    seed: int = 0
+
+
+class FakeOneBotServer:
+    """In-process OneBot 11 WebSocket server for tests and load generation."""
+
+    def __init__(self, options: FakeServerOptions | None = None) -> None:
+        self.options = options or FakeServerOptions()
+        self.account = SyntheticAccount(
+            groups=self.options.groups,
+            friends=self.options.friends,
+            members_per_group=self.options.members_per_group,
+            seed=self.options.seed,
+        )
+        self._rng = random.Random(self.options.seed + 1)
+        self._server: Server | None = None
+        self._connections: set[ServerConnection] = set()
+        self._history: dict[str, deque[dict[str, Any]]] = {}
+        self._next_message_id = 1
+        self._tasks: set[asyncio.Task[Any]] = set()
+        self.port = self.options.port
+
+        # Counters for benchmarks
+        self.events_sent = 0
+        self.requests_handled = 0
+        self.responses_dropped = 0
+        self.actions: dict[str, int] = {}
+
+        self._handlers: dict[str, Callable[[dict[str, Any]], Any]] = {
+            "get_login_info": self._get_login_info,
+            "get_status": lambda p: {"online": True, "good": True},
+            "get_friend_list": lambda p: self.account.friend_list,
+            "get_group_list": lambda p: self.account.group_list,
+            "get_group_info": self._get_group_info,
+            "get_stranger_info": self._get_stranger_info,
+            "get_group_member_list": lambda p: self.account.members(int(p["group_id"])),
+            "get_group_msg_history": self._get_group_msg_history,
+            "get_friend_msg_history": self._get_friend_msg_history,
+            "send_group_msg": self._send_group_msg,
+            "send_private_msg": self._send_private_msg,
+            "send_msg": self._send_msg,
+        }
+
+    @property
+    def ws_url(self) -> str:
+        """URL clients should connect to."""
+        return f"ws://{self.options.host}:{self.port}"
+
+    async def start(self) -> None:
+        """Start listening."""
+        self._server = await serve(self._handle_connection, self.options.host, self.options.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        self._spawn(self._generate_events())
+        if self.options.heartbeat > 0:
+            self._spawn(self._send_heartbeats())
+
+    async def stop(self) -> None:
+        """Close all connections and stop listening."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        """Start and run until cancelled."""
+        await self.start()
+        try:
+            await asyncio.Future()
+        finally:
+            await self.stop()
+
+    def next_message_id(self) -> int:
+        """Allocate a message id."""
+        message_id = self._next_message_id
+        self._next_message_id += 1
+        return message_id
+
+    def make_event(self) -> dict[str, Any]:
+        """Generate one random message event (busier groups come up more often)."""
+        message_id = self.next_message_id()
+        size = self.options.message_size
+        if self.account.friend_list and self._rng.random() < self.options.private_ratio:
+            event = self.account.private_message(message_id, size=size)
+        else:
+            # Skewed choice so a few groups are much busier than the rest
+            groups = self.account.group_list
+            index = min(len(groups) - 1, int(self._rng.expovariate(4 / len(groups))))
+            event = self.account.group_message(
+                message_id, groups[index]["group_id"], size=size
+            )
+        self._remember(event)
+        return event
+
+    async def broadcast(self, data: dict[str, Any]) -> None:
+        """Send an event to every connected client."""
+        frame = json.dumps(data, ensure_ascii=False)
+        for ws in list(self._connections):
+            try:
+                await ws.send(frame)
+                self.events_sent += 1
+            except ConnectionClosed:
+                pass
+
+    async def disconnect_all(self) -> None:
+        """Drop every client connection."""
+        for ws in list(self._connections):
+            await ws.close()
+
+    def _remember(self, event: dict[str, Any]) -> None:
+        if event["message_type"] == "group":
+            key = f"group_{event['group_id']}"
+        else:
+            key = f"private_{event['user_id']}"
+        if key not in self._history:
+            self._history[key] = deque(maxlen=self.options.history_size)
+        self._history[key].append(event)
+
+    async def _generate_events(self) -> None:
+        """Push events to all clients at the configured rate (10 ms ticks).
+
+        ``options.event_rate`` is re-read every tick, so it can be changed
+        while the server runs (e.g. to ramp load up).
+        """
+        tick = 0.01
+        owed = 0.0
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(tick)
+            now = time.monotonic()
+            owed += (now - last) * self.options.event_rate
+            last = now
+            while owed >= 1 and not self.options.frozen:
+                owed -= 1
+                await self.broadcast(self.make_event())
+
+    async def _send_heartbeats(self) -> None:
+        """Push OneBot heartbeat meta events."""
+        while True:
+            await asyncio.sleep(self.options.heartbeat)
+            if self.options.frozen:
+                continue
+            await self.broadcast({
+                "post_type": "meta_event",
+                "meta_event_type": "heartbeat",
+                "time": int(time.time()),
+                "self_id": self.account.self_id,
+                "status": {"online": True, "good": True},
+                "interval": int(self.options.heartbeat * 1000),
+            })
+
+    async def _handle_connection(self, ws: ServerConnection) -> None:
+        token = self.options.token
+        if token:
+            auth = ws.request.headers.get("Authorization", "") if ws.request else ""
+            if auth != f"Bearer {token}":
+                await ws.close(code=1008, reason="unauthorized")
+                return
+
+        self._connections.add(ws)
+        closer = None
+        if self.options.disconnect_after > 0:
+            closer = self._spawn(self._close_later(ws))
+
+        try:
+            async for frame in ws:
+                try:
+                    request = json.loads(frame)
+                except json.JSONDecodeError:
+                    continue
+                self._spawn(self._respond(ws, request))
+        except ConnectionClosed:
+            pass
+        finally:
+            self._connections.discard(ws)
+            if closer:
+                closer.cancel()
+
+    def _spawn(self, coro: Any) -> asyncio.Task[Any]:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _close_later(self, ws: ServerConnection) -> None:
+        await asyncio.sleep(self.options.disconnect_after)
+        await ws.close()
+
+    async def _respond(self, ws: ServerConnection, request: dict[str, Any]) -> None:
+        action = request.get("action", "")
+        params = request.get("params") or {}
+        self.requests_handled += 1
+        self.actions[action] = self.actions.get(action, 0) + 1
+
+        delay = self.options.latency
+        if self.options.jitter:
+            delay += self._rng.uniform(-self.options.jitter, self.options.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.options.frozen or self._rng.random() < self.options.drop_rate:
+            self.responses_dropped += 1
+            return
+
+        handler = self._handlers.get(action)
+        if handler is None:
+            response = {"status": "failed", "retcode": 1404, "data": None,
+                        "message": f"unknown action {action}", "wording": "不支持的API"}
+        else:
+            try:
+                response = {"status": "ok", "retcode": 0, "data": handler(params),
+                            "message": "", "wording": ""}
+            except (KeyError, ValueError, TypeError) as e:
+                response = {"status": "failed", "retcode": 1400, "data": None,
+                            "message": str(e), "wording": "参数错误"}
+
+        if "echo" in request:
+            response["echo"] = request["echo"]
+        try:
+            await ws.send(json.dumps(response, ensure_ascii=False))
+        except ConnectionClosed:
+            pass
+
+    def _get_login_info(self, params: dict[str, Any]) -> dict[str, Any]:
+        return {"user_id": self.account.self_id, "nickname": "mofish"}
+
+    def _get_group_info(self, params: dict[str, Any]) -> dict[str, Any]:
+        group_id = int(params["group_id"])
+        for group in self.account.group_list:
+            if group["group_id"] == group_id:
+                return group
+        raise KeyError(f"group {group_id} not found")
+
+    def _get_stranger_info(self, params: dict[str, Any]) -> dict[str, Any]:
+        user_id = int(params["user_id"])
+        return {"user_id": user_id, "nickname": f"user{user_id}", "sex": "unknown", "age": 0}
+
+    def _get_history(self, key: str, params: dict[str, Any]) -> dict[str, Any]:
+        count = int(params.get("count", 20))
+        messages = list(self._history.get(key, ()))[-count:]
+        return {"messages": messages}
+
+    def _get_group_msg_history(self, params: dict[str, Any]) -> dict[str, Any]:
+        return self._get_history(f"group_{int(params['group_id'])}", params)
+
+    def _get_friend_msg_history(self, params: dict[str, Any]) -> dict[str, Any]:
+        return self._get_history(f"private_{int(params['user_id'])}", params)
+
+    def _store_sent(self, message_type: str, target: int, message: Any) -> int:
+        message_id = self.next_message_id()
+        if isinstance(message, str):
+            message = [{"type": "text", "data": {"text": message}}]
+        event: dict[str, Any] = {
+            "post_type": "message_sent",
+            "message_type": message_type,
+            "sub_type": "normal",
+            "time": int(time.time()),
+            "self_id": self.account.self_id,
+            "message_id": message_id,
+            "user_id": self.account.self_id if message_type == "group" else target,
+            "sender": {"user_id": self.account.self_id, "nickname": "mofish"},
+            "message": message,
+            "raw_message": "".join(
+                s.get("data", {}).get("text", "") for s in message if isinstance(s, dict)
+            ),
+        }
+        if message_type == "group":
+            event["group_id"] = target
+        self._remember(event)
+        return message_id
+
+    def _send_group_msg(self, params: dict[str, Any]) -> dict[str, Any]:
+        group_id = int(params["group_id"])
+        return {"message_id": self._store_sent("group", group_id, params["message"])}
+
+    def _send_private_msg(self, params: dict[str, Any]) -> dict[str, Any]:
+        user_id = int(params["user_id"])
+        return {"message_id": self._store_sent("private", user_id, params["message"])}
+
+    def _send_msg(self, params: dict[str, Any]) -> dict[str, Any]:
+        if params.get("message_type") == "group" or "group_id" in params:
+            return self._send_group_msg(params)
+        return self._send_private_msg(params)
+
+
+def main() -> None:
+    """Run the fake server from the command line."""
+    defaults = FakeServerOptions()
+    parser = argparse.ArgumentParser(description="Fake NapCat OneBot 11 server")
+    parser.add_argument("--host", default=defaults.host)
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--token", default=defaults.token)
+    parser.add_argument("--groups", type=int, default=defaults.groups)
+    parser.add_argument("--friends", type=int, default=defaults.friends)
+    parser.add_argument("--members", type=int, default=defaults.members_per_group)
+    parser.add_argument("--rate", type=float, default=1.0, help="events per second")
+    parser.add_argument("--size", type=int, default=defaults.message_size)
+    parser.add_argument("--latency", type=float, default=defaults.latency)
+    parser.add_argument("--jitter", type=float, default=defaults.jitter)
+    parser.add_argument("--drop-rate", type=float, default=defaults.drop_rate)
+    parser.add_argument("--disconnect-after", type=float, default=defaults.disconnect_after)
+    parser.add_argument("--heartbeat", type=float, default=defaults.heartbeat)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    server = FakeOneBotServer(FakeServerOptions(
+        host=args.host,
+        port=args.port,
+        token=args.token,
+        groups=args.groups,
+        friends=args.friends,
+        members_per_group=args.members,
+        event_rate=args.rate,
+        message_size=args.size,
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        disconnect_after=args.disconnect_after,
+        heartbeat=args.heartbeat,
+        seed=args.seed,
+    ))
+    print(f"Fake NapCat listening on ws://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
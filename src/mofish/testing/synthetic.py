@@ -0,0 +1,154 @@
+"""Synthetic OneBot 11 data for large accounts."""
+
+import random
+import string
+import time
+from typing import Any
+
+_SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗"
+_GIVEN = "伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华"
+_WORDS = [
+    "吃饭", "下班", "开会", "加班", "好的", "收到", "哈哈哈", "明天", "周末",
+    "deploy", "bug", "review", "merge", "上线", "回滚", "需求", "排期", "测试",
+    "今天", "谁有空", "在吗", "看一下", "没问题", "稍等", "已修复", "+1",
+]
+
+
+def random_name(rng: random.Random) -> str:
+    """A short random Chinese or latin nickname."""
+    if rng.random() < 0.7:
+        return rng.choice(_SURNAMES) + "".join(
+            rng.choice(_GIVEN) for _ in range(rng.randint(1, 2))
+        )
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+
+
+def random_text(rng: random.Random, size: int) -> str:
+    """Chat-like text of roughly `size` characters."""
+    parts: list[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS)
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts)[:max(1, size)]
+
+
+class SyntheticAccount:
+    """A fake QQ account with friends, groups and group members."""
+
+    self_id = 10000
+
+    def __init__(
+        self,
+        groups: int = 20,
+        friends: int = 50,
+        members_per_group: int = 200,
+        seed: int = 0,
+    ) -> None:
+        self.seed = seed
+        self.members_per_group = members_per_group
+        self.rng = random.Random(seed)
+        self.friend_list = [
+            {
+                "user_id": 20000 + i,
+                "nickname": random_name(self.rng),
+                "remark": random_name(self.rng) if self.rng.random() < 0.3 else "",
+            }
+            for i in range(friends)
+        ]
+        self.group_list = [
+            {
+                "group_id": 700000 + i,
+                "group_name": f"{random_name(self.rng)}的群{i}",
+                "member_count": members_per_group,
+            }
+            for i in range(groups)
+        ]
+        self._members: dict[int, list[dict[str, Any]]] = {}
+
+    def members(self, group_id: int) -> list[dict[str, Any]]:
+        """Member list of a group, generated on first use."""
+        if group_id not in self._members:
+            rng = random.Random(self.seed * 1_000_003 + group_id)
+            self._members[group_id] = [
+                {
+                    "group_id": group_id,
+                    "user_id": 100000 + i,
+                    "nickname": random_name(rng),
+                    "card": random_name(rng) if rng.random() < 0.5 else "",
+                    "role": "owner" if i == 0 else "member",
+                }
+                for i in range(self.members_per_group)
+            ]
+        return self._members[group_id]
+
+    def segments(self, size: int, group_id: int | None = None) -> list[dict[str, Any]]:
+        """A realistic segment mix: mostly text, some @, faces, images, replies."""
+        rng = self.rng
+        segs: list[dict[str, Any]] = []
+        if rng.random() < 0.05:
+            segs.append({"type": "reply", "data": {"id": str(rng.randint(1, 10**6))}})
+        if group_id is not None and rng.random() < 0.15:
+            member = rng.choice(self.members(group_id))
+            segs.append({"type": "at", "data": {"qq": str(member["user_id"])}})
+        segs.append({"type": "text", "data": {"text": random_text(rng, size)}})
+        if rng.random() < 0.1:
+            segs.append({"type": "face", "data": {"id": str(rng.randint(1, 300))}})
+        if rng.random() < 0.08:
+            segs.append({"type": "image", "data": {"file": "abc.jpg", "url": ""}})
+        return segs
+
+    def group_message(
+        self, message_id: int, group_id: int | None = None, size: int = 20
+    ) -> dict[str, Any]:
+        """A raw group message event."""
+        if group_id is None:
+            group_id = self.rng.choice(self.group_list)["group_id"]
+        sender = self.rng.choice(self.members(group_id))
+        segs = self.segments(size, group_id)
+        return {
+            "post_type": "message",
+            "message_type": "group",
+            "sub_type": "normal",
+            "time": int(time.time()),
+            "self_id": self.self_id,
+            "message_id": message_id,
+            "group_id": group_id,
+            "user_id": sender["user_id"],
+            "sender": {
+                "user_id": sender["user_id"],
+                "nickname": sender["nickname"],
+                "card": sender["card"],
+                "role": sender["role"],
+            },
+            "message": segs,
+            "raw_message": "".join(s["data"].get("text", "") for s in segs),
+            "message_format": "array",
+            "font": 14,
+        }
+
+    def private_message(
+        self, message_id: int, user_id: int | None = None, size: int = 20
+    ) -> dict[str, Any]:
+        """A raw private message event."""
+        friend = (
+            next((f for f in self.friend_list if f["user_id"] == user_id), None)
+            if user_id is not None
+            else self.rng.choice(self.friend_list)
+        ) or {"user_id": user_id, "nickname": str(user_id)}
+        segs = self.segments(size)
+        return {
+            "post_type": "message",
+            "message_type": "private",
+            "sub_type": "friend",
+            "time": int(time.time()),
+            "self_id": self.self_id,
+            "message_id": message_id,
+            "user_id": friend["user_id"],
+            "sender": {"user_id": friend["user_id"], "nickname": friend["nickname"]},
+            "message": segs,
+            "raw_message": "".join(s["data"].get("text", "") for s in segs),
+            "message_format": "array",
+            "font": 14,
+        }
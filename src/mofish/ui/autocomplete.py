@@ -151,4 +151,9 @@ SLASH_COMMANDS = [
     ("/img", "/img - 发送剪贴板图片"),
     ("/img ", "/img <路径> - 发送本地图片"),
     ("/reply ", "/reply <消息ID> - 回复消息"),
+    ("/stats", "/stats - 运行指标面板"),
+    ("/stats export ", "/stats export [路径] - 导出运行指标"),
+    ("/mute", "/mute - 免打扰当前会话 (再次输入取消)"),
+    ("/ignore", "/ignore - 忽略当前会话的所有消息 (再次输入取消)"),
+    ("/archive", "/archive - 归档当前会话，有新消息时恢复"),
 ]
@@ -1,9 +1,10 @@
 """Chat log component for displaying messages."""
 
-from datetime import datetime
+from collections import OrderedDict
 
 from textual.app import ComposeResult
 from textual.containers import VerticalScroll
+from textual.content import Content
 from textual.message import Message
 from textual.widget import Widget
 from textual.widgets import Static
@@ -11,6 +12,25 @@ from textual.widgets import Static
 from mofish.api.events import MessageEvent
 from mofish.config import config
 from mofish.state.member_cache import member_cache
+from mofish.state.message_store import message_store
+from mofish.utils.formatting import (
+    content_parts,
+    format_time,
+    highlight_matches,
+    should_highlight,
+)
+from mofish.utils.metrics import Rate, metrics
+
+# Message row styles
+TIME_STYLE = "#444444"
+SENDER_STYLE = "#00aa00 bold"
+CONTENT_STYLE = "#888888"
+HIGHLIGHT_STYLE = "#ffff00"  # Content of a highlighted row
+MATCH_STYLE = "#ffff00 bold"  # The keywords that made it highlighted
+RECALLED_STYLE = "#555555 strike"
+MENTION_STYLE = "#5f87d7"
+NOTE_STYLE = "#444444"
+FAILED_STYLE = "#ff4444"
 
 
 class MessageRow(Static):
@@ -33,53 +53,181 @@ class MessageRow(Static):
             super().__init__()
             self.message_id = message_id
 
-    def __init__(self, event: MessageEvent, is_highlight: bool = False) -> None:
+    def __init__(
+        self,
+        event: MessageEvent,
+        is_highlight: bool = False,
+        failed: bool = False,
+        text: Content | None = None,
+    ) -> None:
+        """Create a row; `text` is a previously built (cached) rendering."""
+        self._event = event
         self._message_id = event.message_id
+        self._is_highlight = is_highlight
+        self._failed = failed
+        if text is None:
+            with metrics.timer("render.message_row"):
+                text = self._build_text()
+        super().__init__(text, markup=False)
+
+    def _build_text(self) -> Content:
+        """Build this row from styled spans (no markup is parsed)."""
+        event = self._event
+
+        if event.recalled:
+            content_style = RECALLED_STYLE
+            mention_style = RECALLED_STYLE
+        elif self._is_highlight:
+            content_style = HIGHLIGHT_STYLE
+            mention_style = HIGHLIGHT_STYLE
+        else:
+            content_style = CONTENT_STYLE
+            mention_style = MENTION_STYLE
+
+        # Pass group_id for @ display
+        parts = content_parts(event, event.group_id)
+        content: list[tuple[str, str]] = [
+            (text, mention_style if is_mention else content_style)
+            for text, is_mention in parts
+            if text
+        ] or [("[空消息]", content_style)]
+
+        # Local echo state: pending until acked, or failed for good
+        if event.recalled:
+            content.append((" (已撤回)", NOTE_STYLE))
+        elif self._failed:
+            content.append((" ✗", FAILED_STYLE))
+        elif self._message_id < 0:
+            content.append((" …", NOTE_STYLE))
+
+        text = Content.assemble(
+            (format_time(event.time), TIME_STYLE),
+            " ",
+            (event.display_name, SENDER_STYLE),
+            ": ",
+            *content,
+        )
+        if self._is_highlight and not event.recalled:
+            # Bold just the matched keywords, within the message content only
+            offset = len(text) - sum(len(piece) for piece, _ in content)
+            for start, end in highlight_matches(text.plain[offset:]):
+                text = text.stylize(MATCH_STYLE, offset + start, offset + end)
+        return text
+
+    @property
+    def message_id(self) -> int:
+        """Message ID shown by this row (negative while pending)."""
+        return self._message_id
+
+    def mark_sent(self, message_id: int) -> None:
+        """Patch a pending echo with its real message_id."""
+        self._message_id = message_id
+        self.update(self._build_text())
+
+    def mark_failed(self) -> None:
+        """Show that a pending echo could not be sent."""
+        self._failed = True
+        self.update(self._build_text())
+
+    def mark_recalled(self) -> None:
+        """Strike through a recalled message."""
+        self._event.recalled = True
+        self.update(self._build_text())
+
+    def refresh_names(self) -> None:
+        """Re-render @ mentions once group member names are known."""
+        if any(seg.is_at for seg in self._event.segments):
+            self.update(self._build_text())
 
-        # Format time
-        time_str = datetime.fromtimestamp(event.time).strftime("%H:%M:%S")
+    def on_click(self) -> None:
+        """Handle click to reply."""
+        if self._message_id > 0:
+            self.post_message(self.Clicked(self._message_id))
 
-        # Format content (pass group_id for @ display)
-        content = self._format_content(event, event.group_id)
 
-        # Build display
-        sender_style = "[#00aa00 bold]"
-        time_style = "[#444444]"
+class FloodSummary(Static):
+    """A collapsed run of messages from a flooding session."""
 
-        if is_highlight:
-            content_style = "[#ffff00 bold]"
-        else:
-            content_style = "[#888888]"
+    DEFAULT_CSS = """
+    FloodSummary {
+        height: 1;
+        color: #555555;
+    }
+    """
 
-        text = (
-            f"{time_style}{time_str}[/] "
-            f"{sender_style}{event.display_name}[/]: "
-            f"{content_style}{content}[/]"
-        )
+    def __init__(self) -> None:
+        super().__init__("", markup=False)
+        self.count = 0
+        self._senders: set[int] = set()
 
-        super().__init__(text, markup=True)
-
-    def _format_content(self, event: MessageEvent, group_id: int | None) -> str:
-        """Format message content, replacing images with placeholders."""
-        parts: list[str] = []
-        for seg in event.segments:
-            if seg.type == "text":
-                parts.append(seg.text)
-            elif seg.type == "image":
-                parts.append("[图片]")
-            elif seg.type == "face":
-                parts.append("[表情]")
-            elif seg.type == "at":
-                # 使用统一的 @ 显示格式化喵～
-                parts.append(member_cache.format_at_display(group_id, seg.at_qq))
-            else:
-                parts.append(f"[{seg.type}]")
-        return "".join(parts) or "[空消息]"
+    def add(self, event: MessageEvent) -> None:
+        """Fold one more message into the summary."""
+        self.count += 1
+        self._senders.add(event.user_id)
+        messages = "message" if self.count == 1 else "messages"
+        senders = "sender" if len(self._senders) == 1 else "senders"
+        self.update(f"  ⋯ +{self.count} {messages} from {len(self._senders)} {senders}")
 
-    def on_click(self) -> None:
-        """Handle click to reply."""
-        if self._message_id:
-            self.post_message(self.Clicked(self._message_id))
+
+class RenderCache:
+    """Built row text and highlight flag per message, kept per session.
+
+    An entry is reused while the message's recalled / failed state and
+    its group's member names (`member_cache.generation`) are unchanged;
+    changing the highlight keywords or `my_name` drops everything.
+    """
+
+    def __init__(self, max_sessions: int) -> None:
+        self.max_sessions = max_sessions
+        # session_id -> message_id -> (recalled, failed, generation, highlight, text)
+        self._sessions: OrderedDict[
+            str, dict[int, tuple[bool, bool, int, bool, Content]]
+        ] = OrderedDict()
+        self._rules: tuple[tuple[str, ...], str] = ((), "")
+        self._hits = metrics.counter("render_cache.hits")
+        self._misses = metrics.counter("render_cache.misses")
+
+    def check_rules(self) -> None:
+        """Drop everything if the highlight rules changed."""
+        rules = (tuple(config.highlight_keywords), config.my_name)
+        if rules != self._rules:
+            self._rules = rules
+            self._sessions.clear()
+
+    def get(self, event: MessageEvent, failed: bool) -> tuple[bool, Content] | None:
+        """(highlight, text) built earlier for this message, if still valid."""
+        entries = self._sessions.get(event.session_id)
+        entry = entries.get(event.message_id) if entries else None
+        if entry is None or entry[:3] != (
+            event.recalled, failed, member_cache.generation(event.group_id)
+        ):
+            self._misses.inc()
+            return None
+        self._hits.inc()
+        self._sessions.move_to_end(event.session_id)  # Evict least recently used
+        return entry[3], entry[4]
+
+    def put(self, event: MessageEvent, failed: bool, highlight: bool, text: Content) -> None:
+        """Remember a built row (pending local echoes are not cached)."""
+        if event.message_id <= 0:
+            return
+        session_id = event.session_id
+        entries = self._sessions.get(session_id)
+        if entries is None:
+            entries = self._sessions[session_id] = {}
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(session_id)
+        entries[event.message_id] = (
+            event.recalled, failed, member_cache.generation(event.group_id), highlight, text
+        )
+
+    def retain(self, session_id: str, message_ids: set[int]) -> None:
+        """Forget entries of messages no longer buffered."""
+        entries = self._sessions.get(session_id)
+        if entries and len(entries) > len(message_ids):
+            for message_id in entries.keys() - message_ids:
+                del entries[message_id]
 
 
 class ChatLog(Widget):
@@ -95,7 +243,20 @@ class ChatLog(Widget):
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
         self._session_id: str = ""
-        self._messages: dict[str, list[MessageEvent]] = {}
+        self._failed_ids: set[int] = set()  # Local echo ids that failed to send
+        self._rows: dict[int, MessageRow] = {}  # message_id -> mounted row
+        # Flood mode: per-session message rates, sessions currently collapsed,
+        # and the summary row new collapsed messages are folded into
+        self._rates: dict[str, Rate] = {}
+        self._flooding: set[str] = set()
+        self._summary: FloodSummary | None = None
+        self._collapsed = metrics.counter("render.collapsed")
+        self._row_cache = RenderCache(config.render_cache_sessions)
+        # Bumped per render so chunks of an outdated render stop mounting
+        self._render_generation = 0
+        # While suspended, messages are only stored; rendering waits for resume()
+        self._suspended = False
+        self._dirty = False
 
     def compose(self) -> ComposeResult:
         yield Static("[Chat Log]", id="chat-header-title")
@@ -117,70 +278,204 @@ class ChatLog(Widget):
 
     def add_message(self, event: MessageEvent) -> None:
         """Add a message to the log."""
-        session_id = event.session_id
-
-        if session_id not in self._messages:
-            self._messages[session_id] = []
-
-        self._messages[session_id].append(event)
+        with metrics.timer("render.add_message"):
+            self._add_message(event)
 
-        # Trim buffer
-        if len(self._messages[session_id]) > config.message_buffer_size:
-            self._messages[session_id] = self._messages[session_id][-config.message_buffer_size:]
+    def _add_message(self, event: MessageEvent) -> None:
+        """Store a message and render it if its session is open."""
+        session_id = event.session_id
+        if not message_store.add(event):
+            return  # Already shown
+        flooding = self._update_flood(session_id)
 
         # If this is current session, add to view
         if session_id == self._session_id:
-            is_highlight = self._should_highlight(event)
+            if self._suspended:
+                self._dirty = True
+                return
             try:
                 scroll = self.query_one("#message-scroll", VerticalScroll)
-                row = MessageRow(event, is_highlight=is_highlight)
-                scroll.mount(row)
+                if flooding and not self._is_priority(event):
+                    # Collapsed: fold into the open summary row
+                    if self._summary is None:
+                        self._summary = FloodSummary()
+                        scroll.mount(self._summary)
+                    self._summary.add(event)
+                    self._collapsed.inc()
+                else:
+                    self._summary = None
+                    scroll.mount(self._make_row(event))
                 scroll.scroll_end(animate=False)
             except Exception:
                 pass
 
+    def _update_flood(self, session_id: str) -> bool:
+        """Track a session's message rate; True while it is in flood mode."""
+        rate = self._rates.get(session_id)
+        if rate is None:
+            rate = self._rates[session_id] = Rate(window=config.flood_window)
+        rate.mark()
+
+        per_second = rate.per_second()
+        if session_id in self._flooding:
+            if per_second < config.flood_exit_rate:
+                self._flooding.discard(session_id)
+        elif per_second >= config.flood_enter_rate:
+            self._flooding.add(session_id)
+        return session_id in self._flooding
+
+    def _is_priority(self, event: MessageEvent) -> bool:
+        """Messages that are never collapsed.
+
+        Besides mentions and highlights, our own messages stay visible:
+        a pending echo (negative id) needs its row for ack / failure.
+        """
+        own = event.message_id < 0 or bool(event.self_id) and event.user_id == event.self_id
+        return own or event.mentions_self or self._should_highlight(event)
+
+    def suspend(self) -> None:
+        """Stop rendering; new messages are only stored until resume()."""
+        self._suspended = True
+
+    def resume(self) -> None:
+        """Resume rendering, re-rendering the current session once if it changed."""
+        self._suspended = False
+        if self._dirty:
+            self._dirty = False
+            self._render_messages()
+
+    def _make_row(self, event: MessageEvent) -> MessageRow:
+        """Create a row widget for a message, reusing cached text."""
+        failed = event.message_id in self._failed_ids
+        self._row_cache.check_rules()
+        cached = self._row_cache.get(event, failed)
+        if cached:
+            highlight, text = cached
+            row = MessageRow(event, is_highlight=highlight, failed=failed, text=text)
+        else:
+            highlight = self._should_highlight(event)
+            row = MessageRow(event, is_highlight=highlight, failed=failed)
+            self._row_cache.put(event, failed, highlight, row.content)
+        self._rows[event.message_id] = row
+        return row
+
+    def show_history(self, session_id: str, events: list[MessageEvent]) -> int:
+        """Merge fetched history into the store and render it in one batch.
+
+        Returns how many messages were new.
+        """
+        added = message_store.merge(session_id, events)
+        if not added or session_id != self._session_id:
+            return added
+        if self._suspended:
+            self._dirty = True
+            return added
+        self._render_messages()
+        return added
+
+    def refresh_names(self, session_id: str) -> None:
+        """Patch member names into the open session's rows."""
+        if session_id != self._session_id:
+            return
+        if self._suspended:
+            self._dirty = True  # Re-rendered with the names on resume()
+            return
+        for row in self._rows.values():
+            row.refresh_names()
+
     def _render_messages(self) -> None:
-        """Render all messages for current session."""
+        """Render the current session, newest rows first.
+
+        The newest screenful is mounted at once; older rows are mounted
+        above it `config.render_chunk_size` at a time on the following
+        frames, so input stays responsive while a long history fills in.
+        """
+        self._render_generation += 1
         try:
             scroll = self.query_one("#message-scroll", VerticalScroll)
             scroll.remove_children()
+            self._rows.clear()
+            self._summary = None
+
+            messages = message_store.get_messages(self._session_id)
+            self._row_cache.retain(
+                self._session_id, {event.message_id for event in messages}
+            )
+            first = scroll.size.height or config.render_chunk_size
+            older, newest = messages[:-first], messages[-first:]
+            rows = [self._make_row(event) for event in newest]
+            if rows:
+                scroll.mount_all(rows)
+            # Stays at the bottom while older rows are added above
+            scroll.anchor()
+        except Exception:
+            return
 
-            messages = self._messages.get(self._session_id, [])
-            for event in messages:
-                is_highlight = self._should_highlight(event)
-                scroll.mount(MessageRow(event, is_highlight=is_highlight))
+        if older:
+            self.call_after_refresh(self._mount_older, older, self._render_generation)
 
-            scroll.scroll_end(animate=False)
+    def _mount_older(self, older: list[MessageEvent], generation: int) -> None:
+        """Mount the next chunk of older rows above the ones shown."""
+        if generation != self._render_generation:
+            return  # Another session (or a re-render) took over
+        if self._suspended:
+            self._dirty = True
+            return
+
+        size = config.render_chunk_size
+        chunk, rest = older[-size:], older[:-size]
+        try:
+            scroll = self.query_one("#message-scroll", VerticalScroll)
+            scroll.mount_all([self._make_row(event) for event in chunk], before=0)
         except Exception:
-            pass
+            return
+
+        if rest:
+            self.call_after_refresh(self._mount_older, rest, generation)
 
     def _should_highlight(self, event: MessageEvent) -> bool:
         """Check if message should be highlighted."""
-        text = event.plain_text.lower()
-
-        # Check keywords
-        for keyword in config.highlight_keywords:
-            if keyword.lower() in text:
-                return True
-
-        # Check if mentioned
-        if config.my_name and config.my_name.lower() in text:
-            return True
-
-        return False
+        return should_highlight(event)
 
     def clear(self) -> None:
         """Clear current session messages from view."""
+        self._render_generation += 1
         try:
             scroll = self.query_one("#message-scroll", VerticalScroll)
             scroll.remove_children()
+            self._rows.clear()
+            self._summary = None
         except Exception:
             pass
 
+    def ack_message(self, session_id: str, local_id: int, message_id: int) -> None:
+        """Replace a pending echo's local id with the server message_id."""
+        message_store.reassign_id(session_id, local_id, message_id)
+
+        if session_id == self._session_id:
+            row = self._rows.pop(local_id, None)
+            if row:
+                self._rows[message_id] = row
+                row.mark_sent(message_id)
+
+    def fail_message(self, session_id: str, local_id: int) -> None:
+        """Mark a pending echo as failed."""
+        self._failed_ids.add(local_id)
+
+        if session_id == self._session_id:
+            row = self._rows.get(local_id)
+            if row:
+                row.mark_failed()
+
+    def recall_message(self, session_id: str, message_id: int) -> None:
+        """Strike through a recalled message in place."""
+        message_store.recall(session_id, message_id)
+
+        if session_id == self._session_id:
+            row = self._rows.get(message_id)
+            if row:
+                row.mark_recalled()
+
     def get_message_by_id(self, message_id: int) -> MessageEvent | None:
         """Get message event by message ID from current session."""
-        messages = self._messages.get(self._session_id, [])
-        for event in messages:
-            if event.message_id == message_id:
-                return event
-        return None
+        return message_store.get_message(self._session_id, message_id)
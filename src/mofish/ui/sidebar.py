@@ -8,6 +8,7 @@ from textual.widget import Widget
 from textual.widgets import Label, Static
 
 from mofish.api.events import FriendInfo, GroupInfo
+from mofish.state.session import POLICY_ARCHIVED, POLICY_IGNORED, POLICY_MUTED
 
 
 class SessionItem(Widget):
@@ -27,6 +28,13 @@ class SessionItem(Widget):
     SessionItem.--active {
         background: #1a3319;
     }
+    SessionItem.--muted {
+        color: #555555;
+    }
+    SessionItem.--ignored {
+        color: #333333;
+        text-style: strike;
+    }
     """
 
     is_active: reactive[bool] = reactive(False)
@@ -40,6 +48,13 @@ class SessionItem(Widget):
             self.session_id = session_id
             self.name = name
 
+    class Focused(Message):
+        """Message sent when keyboard focus moves onto the session."""
+
+        def __init__(self, session_id: str) -> None:
+            super().__init__()
+            self.session_id = session_id
+
     def __init__(
         self,
         session_id: str,
@@ -68,6 +83,10 @@ class SessionItem(Widget):
         # Could add unread badge here
         pass
 
+    def on_focus(self) -> None:
+        """Report focus so the session can be prefetched."""
+        self.post_message(self.Focused(self.session_id))
+
     def on_click(self) -> None:
         """Handle click event."""
         self.post_message(self.Selected(self.session_id, self._name))
@@ -107,6 +126,7 @@ class Sidebar(Widget):
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
         self._sessions: dict[str, SessionItem] = {}
+        self._last_focused = ""
 
     def compose(self) -> ComposeResult:
         # No title, just the list
@@ -137,6 +157,19 @@ class Sidebar(Widget):
         for sid, item in self._sessions.items():
             item.is_active = (sid == session_id)
 
+    def predict_next(self, session_id: str) -> list[str]:
+        """The focused session and the one keyboard focus is heading to."""
+        visible = [sid for sid, item in self._sessions.items() if item.display]
+        if session_id not in visible:
+            return [session_id]
+        index = visible.index(session_id)
+        previous = self._last_focused
+        self._last_focused = session_id
+        step = -1 if previous in visible and visible.index(previous) > index else 1
+        if 0 <= index + step < len(visible):
+            return [session_id, visible[index + step]]
+        return [session_id]
+
     def get_session(self, session_id: str) -> SessionItem | None:
         """Get session item by ID."""
         return self._sessions.get(session_id)
@@ -151,6 +184,21 @@ class Sidebar(Widget):
         if session_id in self._sessions:
             self._sessions[session_id].unread_count += 1
 
+    def sync_session(self, session_id: str, unread_count: int, preview: str) -> None:
+        """Set unread count and preview in one go (used after suspension)."""
+        item = self._sessions.get(session_id)
+        if item:
+            item.unread_count = unread_count
+            item.update_preview(preview)
+
+    def set_policy(self, session_id: str, policy: str) -> None:
+        """Dim muted / ignored sessions and hide archived ones."""
+        item = self._sessions.get(session_id)
+        if item:
+            item.set_class(policy == POLICY_MUTED, "--muted")
+            item.set_class(policy == POLICY_IGNORED, "--ignored")
+            item.display = policy != POLICY_ARCHIVED
+
     def clear_unread(self, session_id: str) -> None:
         """Clear unread count for a session."""
         if session_id in self._sessions:
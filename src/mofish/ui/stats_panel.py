@@ -0,0 +1,95 @@
+"""Runtime metrics overlay (/stats)."""
+
+from rich.text import Text
+from textual.app import ComposeResult
+from textual.reactive import reactive
+from textual.timer import Timer
+from textual.widget import Widget
+from textual.widgets import Static
+
+from mofish.utils.metrics import metrics
+
+
+def format_metrics() -> Text:
+    """Format the metrics registry as aligned text lines."""
+    snapshot = metrics.snapshot()
+    text = Text()
+
+    for cache in ("member_cache", "api_cache", "prefetch", "render_cache"):
+        hits = snapshot.get(f"{cache}.hits", {}).get("value", 0)
+        misses = snapshot.get(f"{cache}.misses", {}).get("value", 0)
+        if hits + misses:
+            text.append(f"{cache + '.hit_rate':<28}", style="#00aa00")
+            text.append(f"{hits / (hits + misses):.1%} ({hits}/{hits + misses})\n")
+
+    for name, data in snapshot.items():
+        kind = data["type"]
+        if kind == "counter":
+            value = f"{data['value']}"
+        elif kind == "gauge":
+            value = f"{data['value']:g}"
+        elif kind == "rate":
+            value = f"{data['per_second']:.1f}/s (total {data['total']})"
+        else:
+            value = (
+                f"n={data['count']} avg={data['mean_ms']:.2f}ms "
+                f"p95≤{data['p95_ms']:g}ms max={data['max_ms']:.1f}ms"
+            )
+        text.append(f"{name:<28}", style="#00aa00")
+        text.append(f"{value}\n")
+
+    return text
+
+
+class StatsPanel(Widget):
+    """Live view of the metrics registry, refreshed once per second."""
+
+    DEFAULT_CSS = """
+    StatsPanel {
+        width: 72;
+        background: #0d0d0d;
+        border-left: solid #1a1a1a;
+        padding: 0 1;
+        display: none;
+    }
+    StatsPanel.--visible {
+        display: block;
+    }
+    StatsPanel #stats-title {
+        color: #00cc00;
+        text-style: bold;
+    }
+    StatsPanel #stats-body {
+        color: #888888;
+    }
+    """
+
+    is_visible: reactive[bool] = reactive(False)
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._timer: Timer | None = None
+
+    def compose(self) -> ComposeResult:
+        yield Static("[stats]", id="stats-title", markup=False)
+        yield Static("", id="stats-body")
+
+    def on_mount(self) -> None:
+        self._timer = self.set_interval(1.0, self.refresh_stats, pause=True)
+
+    def watch_is_visible(self, value: bool) -> None:
+        self.set_class(value, "--visible")
+        if self._timer is None:
+            return
+        if value:
+            self.refresh_stats()
+            self._timer.resume()
+        else:
+            self._timer.pause()
+
+    def refresh_stats(self) -> None:
+        """Redraw the metrics."""
+        try:
+            self.query_one("#stats-body", Static).update(format_metrics())
+        except Exception:
+            pass
@@ -0,0 +1,195 @@
+"""Procedural fake log streams for boss mode.
+
+Every stream is an endless generator of styled Rich ``Text`` lines. Module
+paths come from the real working directory so the output matches the project
+on screen.
+"""
+
+import os
+import random
+import time
+from itertools import count
+from pathlib import Path
+from typing import Iterator
+
+from rich.text import Text
+
+# Directories never worth listing
+_SKIP_DIRS = {"node_modules", "__pycache__", "venv", "dist", "build", "target"}
+
+# Files never worth listing: hidden ones and our own state / trace files
+_SKIP_FILE_PREFIXES = (".", "mofish-")
+
+_FALLBACK_FILES = [
+    "src/index.ts",
+    "src/App.tsx",
+    "src/components/Header.tsx",
+    "src/components/Sidebar.tsx",
+    "src/utils/request.ts",
+    "src/store/index.ts",
+]
+
+_NPM_PACKAGES = [
+    "lodash", "react", "react-dom", "typescript", "webpack", "babel-loader",
+    "eslint", "postcss", "@types/node", "axios", "rxjs", "tslib", "chalk",
+    "semver", "glob", "minimatch", "debug", "ms", "uuid", "yargs",
+]
+
+_DIM = "#888888"
+_WARN = "#ffaa00"
+_OK = "#00ff00"
+
+
+def _line(text: str, color: str = _DIM) -> Text:
+    return Text(text, style=color)
+
+
+def scan_project_files(root: Path | None = None, limit: int = 400) -> list[str]:
+    """List up to `limit` source files under `root` as relative paths."""
+    root = root or Path.cwd()
+    files: list[str] = []
+    try:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [
+                d for d in dirnames if not d.startswith(".") and d not in _SKIP_DIRS
+            ]
+            for name in filenames:
+                if name.startswith(_SKIP_FILE_PREFIXES):
+                    continue
+                files.append(os.path.relpath(os.path.join(dirpath, name), root))
+                if len(files) >= limit:
+                    return files
+    except OSError:
+        pass
+    return files or list(_FALLBACK_FILES)
+
+
+def progress_bar(fraction: float, width: int = 30) -> str:
+    """Render an ASCII progress bar like `[=======>      ]`."""
+    filled = int(fraction * width)
+    if filled >= width:
+        return "[" + "=" * width + "]"
+    return "[" + "=" * filled + ">" + " " * (width - filled - 1) + "]"
+
+
+def _size(n_bytes: float) -> str:
+    if n_bytes >= 1024 * 1024:
+        return f"{n_bytes / 1024 / 1024:.2f} MiB"
+    return f"{n_bytes / 1024:.1f} KiB"
+
+
+def webpack_stream(files: list[str]) -> Iterator[Text]:
+    """Endless webpack dev-server output: rebuilds triggered by file changes."""
+    build_ms = random.randint(900, 1600)
+    for rebuild in count():
+        if rebuild:
+            changed = random.choice(files)
+            yield _line(f"[webpack-dev-server] File change detected: ./{changed}")
+        total = random.randint(180, 900)
+        done = 0
+        while done < total:
+            done = min(total, done + random.randint(total // 12, total // 5))
+            module = random.choice(files)
+            yield _line(
+                f"{progress_bar(done / total)} {done * 100 // total}% building "
+                f"{done}/{total} modules {random.randint(1, 4)} active ./{module}"
+            )
+        for name in ("main", "vendors", "runtime"):
+            yield _line(
+                f"asset {name}.{random.getrandbits(32):08x}.js "
+                f"{_size(random.randint(20_000, 2_000_000))} [emitted] (name: {name})"
+            )
+        if random.random() < 0.2:
+            yield _line(f"WARNING in ./{random.choice(files)}", _WARN)
+            yield _line(
+                f"  Line {random.randint(1, 400)}:  'tmp' is assigned a value "
+                "but never used  no-unused-vars",
+                _WARN,
+            )
+        build_ms += random.randint(-120, 180)
+        build_ms = max(300, build_ms)
+        yield _line(f"webpack 5.89.0 compiled successfully in {build_ms} ms", _OK)
+
+
+def npm_stream(files: list[str]) -> Iterator[Text]:
+    """Endless npm install output with a spinner-style progress bar."""
+    spinner = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+    for run in count():
+        total = random.randint(600, 1500)
+        elapsed_ms = 0
+        for i in range(0, total, random.randint(25, 60)):
+            pkg = random.choice(_NPM_PACKAGES)
+            step_ms = random.randint(3, 400)
+            elapsed_ms += step_ms
+            yield _line(
+                f"{progress_bar(i / total, 18)} {spinner[i % len(spinner)]} "
+                f"reify:{pkg}: timing reifyNode:node_modules/{pkg} "
+                f"Completed in {step_ms}ms"
+            )
+            if random.random() < 0.03:
+                yield _line(
+                    f"npm WARN deprecated {pkg}@{random.randint(1, 9)}.0.0: "
+                    "this version is no longer supported",
+                    _WARN,
+                )
+        yield _line(f"added {total} packages in {elapsed_ms / 1000:.1f}s")
+        yield _line(f"{random.randint(80, 200)} packages are looking for funding")
+        yield _line("> node scripts/postinstall.js")
+        for path in random.sample(files, min(len(files), 3)):
+            yield _line(f"  patched {path}")
+        yield _line(f"✓ Dependencies installed ({run + 1})", _OK)
+
+
+def _java_class(path: str) -> str:
+    stem = Path(path).with_suffix("").as_posix().replace("/", ".").replace("-", "_")
+    return "com.example." + stem.lstrip(".")
+
+
+def maven_stream(files: list[str]) -> Iterator[Text]:
+    """Endless mvn test output; test classes are named after real files."""
+    elapsed = 0.0
+    for _ in count():
+        yield _line(f"[INFO] Compiling {random.randint(40, 400)} source files to target/classes")
+        yield _line("[INFO] --- maven-surefire-plugin:3.2.2:test (default-test) @ app ---")
+        for path in random.sample(files, min(len(files), random.randint(4, 10))):
+            cls = _java_class(path)
+            took = random.uniform(0.01, 3.0)
+            elapsed += took
+            yield _line(f"[INFO] Running {cls}Test")
+            yield _line(
+                f"[INFO] Tests run: {random.randint(1, 40)}, Failures: 0, Errors: 0, "
+                f"Skipped: 0, Time elapsed: {took:.3f} s - in {cls}Test"
+            )
+            if random.random() < 0.05:
+                yield _line(
+                    "[WARN] HikariPool-1 - Connection is not available, "
+                    "request timed out after 30000ms.",
+                    _WARN,
+                )
+                yield _line(f"    at {cls}.setUp({Path(path).stem}.java:{random.randint(10, 300)})")
+        yield _line("[INFO] BUILD SUCCESS", _OK)
+        yield _line(f"[INFO] Total time: {elapsed:.3f} s")
+        yield _line(f"[INFO] Finished at: {time.strftime('%Y-%m-%dT%H:%M:%S')}")
+
+
+def ping_stream(host: str = "192.168.1.1") -> Iterator[Text]:
+    """Endless ping output with jittering round-trip times."""
+    yield _line(f"PING {host} ({host}): 56 data bytes")
+    rtt = random.uniform(0.8, 1.5)
+    for seq in count():
+        rtt = max(0.2, rtt + random.uniform(-0.2, 0.2))
+        yield _line(f"64 bytes from {host}: icmp_seq={seq} ttl=64 time={rtt:.3f} ms")
+
+
+STREAMS = {
+    "webpack": ("$ npm run dev", webpack_stream),
+    "npm": ("$ npm install", npm_stream),
+    "java": ("$ mvn clean test", maven_stream),
+    "ping": ("$ ping 192.168.1.1", lambda files: ping_stream()),
+}
+
+
+def random_stream(files: list[str] | None = None) -> tuple[str, Iterator[Text]]:
+    """Pick a random stream. Returns (header command, line iterator)."""
+    header, factory = random.choice(list(STREAMS.values()))
+    return header, factory(files if files is not None else scan_project_files())
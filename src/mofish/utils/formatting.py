@@ -0,0 +1,72 @@
+"""Message formatting and highlight rules shared by the UI and the CLI.
+
+Kept free of Textual so ``mofish tail`` can use it without loading the UI.
+"""
+
+from datetime import datetime
+
+from mofish.api.events import MessageEvent
+from mofish.config import config
+from mofish.state.member_cache import member_cache
+
+
+def format_time(timestamp: int) -> str:
+    """Format a message timestamp as HH:MM:SS."""
+    return datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+
+
+def content_parts(event: MessageEvent, group_id: int | None) -> list[tuple[str, bool]]:
+    """Message content as (text, is_mention) pieces, images as placeholders."""
+    parts: list[tuple[str, bool]] = []
+    for seg in event.segments:
+        if seg.type == "text":
+            parts.append((seg.text, False))
+        elif seg.type == "image":
+            parts.append(("[图片]", False))
+        elif seg.type == "face":
+            parts.append(("[表情]", False))
+        elif seg.type == "at":
+            # 使用统一的 @ 显示格式化喵～
+            parts.append((member_cache.format_at_display(group_id, seg.at_qq), True))
+        else:
+            parts.append((f"[{seg.type}]", False))
+    return parts
+
+
+def format_content(event: MessageEvent, group_id: int | None) -> str:
+    """Format message content, replacing images with placeholders."""
+    return "".join(text for text, _ in content_parts(event, group_id)) or "[空消息]"
+
+
+def highlight_matches(text: str) -> list[tuple[int, int]]:
+    """(start, end) of every highlight keyword and `my_name` in `text`."""
+    lowered = text.lower()
+    needles = [keyword.lower() for keyword in config.highlight_keywords]
+    if config.my_name:
+        needles.append(config.my_name.lower())
+
+    spans: list[tuple[int, int]] = []
+    for needle in needles:
+        if not needle:
+            continue
+        start = lowered.find(needle)
+        while start != -1:
+            spans.append((start, start + len(needle)))
+            start = lowered.find(needle, start + len(needle))
+    return spans
+
+
+def should_highlight(event: MessageEvent) -> bool:
+    """Check if message should be highlighted."""
+    text = event.plain_text.lower()
+
+    # Check keywords
+    for keyword in config.highlight_keywords:
+        if keyword.lower() in text:
+            return True
+
+    # Check if mentioned
+    if config.my_name and config.my_name.lower() in text:
+        return True
+
+    return False
@@ -0,0 +1,113 @@
+"""Event-loop lag monitor and slow-callback tracer.
+
+A probe task on the loop measures how late its sleeps wake up (scheduling
+lag). A watchdog thread notices when the probe stops beating and captures
+the loop thread's stack while it is still blocked, so the trace shows the
+code that stalled the UI. Only imported and started when enabled.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+from logging.handlers import RotatingFileHandler
+
+from mofish.config import state_file
+from mofish.utils.metrics import metrics
+
+
+class LoopMonitor:
+    """Watches one asyncio loop for lag and blocking callbacks."""
+
+    def __init__(
+        self,
+        trace_path: str,
+        interval: float = 0.1,
+        threshold: float = 0.1,
+        max_bytes: int = 1_000_000,
+        backups: int = 3,
+    ) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self._beat = time.monotonic()
+        self._loop_thread_id = 0
+        self._running = False
+        self._probe_task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._lag = metrics.histogram("loop.lag")
+        self._stalls = metrics.counter("loop.stalls")
+
+        self._logger = logging.getLogger("mofish.loop_monitor")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._handler = RotatingFileHandler(
+            state_file(trace_path), maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+        self._logger.addHandler(self._handler)
+
+    def start(self) -> None:
+        """Start monitoring the running loop (call from the loop thread)."""
+        if self._running:
+            return
+        self._running = True
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._probe_task = asyncio.get_running_loop().create_task(self._probe())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="mofish-loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        """Stop monitoring and close the trace file."""
+        self._running = False
+        if self._probe_task:
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=self.interval * 2)
+            self._watchdog = None
+        self._logger.removeHandler(self._handler)
+        self._handler.close()
+
+    async def _probe(self) -> None:
+        """Sleep for `interval` repeatedly and record how late each wake-up is."""
+        while self._running:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._lag.observe(max(0.0, now - start - self.interval) * 1000)
+            self._beat = now
+
+    def _watch(self) -> None:
+        """Watchdog thread: report the loop's stack while it is blocked."""
+        stall_started: float | None = None
+        while self._running:
+            time.sleep(self.interval / 2)
+            beat = self._beat
+            blocked = time.monotonic() - beat - self.interval
+
+            if stall_started is not None and stall_started != beat:
+                # Loop is running again; record how long the stall lasted
+                self._write("stall_end", beat - stall_started - self.interval, [])
+                stall_started = None
+
+            if stall_started is None and blocked > self.threshold:
+                # New stall: grab the stack while the loop is still stuck in it
+                stall_started = beat
+                self._stalls.inc()
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = traceback.format_stack(frame) if frame else []
+                self._write("stall", blocked, stack)
+
+    def _write(self, kind: str, blocked: float, stack: list[str]) -> None:
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "kind": kind,
+            "blocked_ms": round(blocked * 1000, 1),
+            "stack": [line.rstrip() for line in stack],
+        }
+        self._logger.info(json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,177 @@
+"""Lightweight runtime metrics (counters, rates, gauges, histograms)."""
+
+import bisect
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+# Histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "counter", "value": self.value}
+
+
+class Rate:
+    """Events per second over a sliding window."""
+
+    def __init__(self, window: float = 5.0) -> None:
+        self.window = window
+        self.total = 0
+        self._times: deque[float] = deque()
+
+    def mark(self) -> None:
+        now = time.monotonic()
+        self.total += 1
+        self._times.append(now)
+        # Drop old samples here so memory stays bounded by the window
+        cutoff = now - self.window
+        while self._times[0] < cutoff:
+            self._times.popleft()
+
+    def per_second(self) -> float:
+        cutoff = time.monotonic() - self.window
+        while self._times and self._times[0] < cutoff:
+            self._times.popleft()
+        return len(self._times) / self.window
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "rate", "per_second": self.per_second(), "total": self.total}
+
+
+class Gauge:
+    """Current value, either set explicitly or read from a callback."""
+
+    def __init__(self, read: Callable[[], float] | None = None) -> None:
+        self._read = read
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self._read() if self._read else self._value
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"type": "gauge", "value": self.value}
+
+
+class Histogram:
+    """Latency histogram with fixed buckets (milliseconds)."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS_MS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.sum += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def percentile(self, pct: float) -> float:
+        """Approximate percentile (bucket upper bound)."""
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "type": "histogram",
+            "count": self.count,
+            "mean_ms": self.mean,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": self.max,
+            "buckets_ms": list(self.buckets),
+            "counts": list(self.counts),
+        }
+
+
+class MetricsRegistry:
+    """Named metrics, created on first use."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Rate | Gauge | Histogram] = {}
+        self.started_at = time.time()
+
+    def counter(self, name: str) -> Counter:
+        if name not in self._metrics:
+            self._metrics[name] = Counter()
+        return self._metrics[name]  # type: ignore[return-value]
+
+    def rate(self, name: str) -> Rate:
+        if name not in self._metrics:
+            self._metrics[name] = Rate()
+        return self._metrics[name]  # type: ignore[return-value]
+
+    def gauge(self, name: str, read: Callable[[], float] | None = None) -> Gauge:
+        if name not in self._metrics:
+            self._metrics[name] = Gauge(read)
+        return self._metrics[name]  # type: ignore[return-value]
+
+    def histogram(self, name: str) -> Histogram:
+        if name not in self._metrics:
+            self._metrics[name] = Histogram()
+        return self._metrics[name]  # type: ignore[return-value]
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time a block into the named histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name).observe((time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Current value of every metric, sorted by name."""
+        return {name: self._metrics[name].snapshot() for name in sorted(self._metrics)}
+
+    def export(self, path: str | Path) -> Path:
+        """Write a JSON snapshot of all metrics to a file."""
+        path = Path(path)
+        data = {
+            "started_at": self.started_at,
+            "exported_at": time.time(),
+            "metrics": self.snapshot(),
+        }
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        return path
+
+    def reset(self) -> None:
+        """Drop all metrics."""
+        self._metrics.clear()
+        self.started_at = time.time()
+
+
+# Global registry
+metrics = MetricsRegistry()